@@ -0,0 +1,225 @@
+"""Manim Visual Editor 的编译后端：LaTeX 批量编译、mathtext 栅格化与单位校准
+
+不依赖 Qt，编译子进程只导入本模块 (及 scene_core)，不必加载 PyQt 等界面依赖。
+"""
+import sys
+import os
+import re
+import hashlib
+import subprocess
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Optional, List, Tuple, Dict, Any
+
+from scene_core import CURRENT_DIR
+
+# === 配置 ===
+# manim、matplotlib 导入耗时较长，均在首次使用时才导入 (见 load_manim / MathTextRasterizer)
+TEX_DIR = os.path.join(CURRENT_DIR, "tex_cache")
+
+# === manim 与 LaTeX 模板 ===
+def load_manim(tex_dir: str = TEX_DIR):
+    """首次调用时导入 manim，并把 LaTeX 输出目录指向编辑器的缓存目录"""
+    import manim
+    manim.config.tex_dir = tex_dir
+    return manim
+
+def measure_manim_unit_per_pixel() -> float:
+    """公式 SVG 的一个像素对应的 Manim 单位长度，需要导入 manim 并运行一次 LaTeX，可在编译子进程中运行"""
+    manim = load_manim()
+    from manim.utils.tex_file_writing import tex_to_svg_file
+    with open(str(tex_to_svg_file("$x$", tex_template=get_tex_template()[0])), 'r', encoding='utf-8') as f:
+        match = re.search(r'viewBox=[\'"]\s*\S+[\s,]+\S+[\s,]+\S+[\s,]+([\d.eE+-]+)', f.read())
+    if match is None: raise ValueError("SVG 缺少 viewBox")
+    return float(Decimal(str(manim.MathTex("x").height)) / Decimal(match.group(1)))
+
+_tex_template: Optional["TexTemplate"] = None
+_tex_template_hash: Optional[str] = None
+
+def get_tex_template() -> Tuple["TexTemplate", str]:
+    # 所有编译共用同一个模板实例，避免每次构造 TexTemplate
+    global _tex_template, _tex_template_hash
+    if _tex_template is None:
+        load_manim()
+        from manim.utils.tex_file_writing import TexTemplate
+        _tex_template = TexTemplate()
+        _tex_template_hash = hashlib.sha256(_tex_template.body.encode('utf-8')).hexdigest()[:16]
+    return _tex_template, _tex_template_hash
+
+def tex_template_hash() -> str:
+    # 可在编译子进程中运行，主进程不必为求哈希导入 manim
+    return get_tex_template()[1]
+
+def tex_cache_key(latex_text: str, template_hash: str) -> str:
+    return hashlib.sha256(f"{template_hash}\0{latex_text}".encode('utf-8')).hexdigest()[:24]
+
+# === LaTeX 编译 ===
+def compile_latex_svgs(latex_texts: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """纯编译，不读写缓存，可在编译子进程中运行。返回 {公式: (SVG 路径, SVG 内容, 错误信息)}"""
+    tex_template, template_hash = get_tex_template()
+    if len(latex_texts) > 1:
+        page_files = _compile_latex_pages(latex_texts, tex_template, template_hash)
+        if page_files is not None:
+            results = {}
+            for latex_text, svg_file in page_files.items():
+                with open(svg_file, 'r', encoding='utf-8') as f:
+                    results[latex_text] = (svg_file, f.read(), None)
+            return results
+    # 单个公式或批量编译失败（通常是其中某个公式有语法错误）时逐个编译，以便定位错误
+    results = {}
+    for latex_text in latex_texts:
+        try:
+            from manim.utils.tex_file_writing import tex_to_svg_file
+            svg_file = str(tex_to_svg_file(f"${latex_text}$", tex_template=tex_template))
+            if not os.path.exists(svg_file): raise FileNotFoundError("LaTeX Compile Failed: File not found")
+            with open(svg_file, 'r', encoding='utf-8') as f:
+                results[latex_text] = (svg_file, f.read(), None)
+        except Exception as e:
+            results[latex_text] = (None, None, str(e))
+    return results
+
+def _batch_tex_command(tex_template: "TexTemplate", tex_file: str, out_dir: str) -> Optional[List[str]]:
+    compiler = tex_template.tex_compiler
+    if compiler in ("latex", "pdflatex", "luatex", "lualatex"):
+        return [compiler, "-interaction=batchmode", f"-output-format={tex_template.output_format[1:]}", "-halt-on-error", f"-output-directory={out_dir}", tex_file]
+    if compiler == "xelatex":
+        return [compiler, "-no-pdf", "-interaction=batchmode", "-halt-on-error", f"-output-directory={out_dir}", tex_file]
+    return None
+
+def _compile_latex_pages(pending: List[str], tex_template: "TexTemplate", template_hash: str) -> Optional[Dict[str, str]]:
+    tex_dir = os.path.abspath(TEX_DIR)
+    os.makedirs(tex_dir, exist_ok=True)
+    stem = "batch_" + hashlib.sha256("\0".join(pending).encode('utf-8')).hexdigest()[:16]
+    tex_file = os.path.join(tex_dir, stem + ".tex")
+    command = _batch_tex_command(tex_template, tex_file, tex_dir)
+    if command is None: return None
+
+    # preview 宏包的 active 模式下每个 preview 环境单独成页，dvisvgm 再按页裁切
+    pages = "\n".join(f"\\begin{{preview}}${t}$\\end{{preview}}" for t in pending)
+    document = "\n".join([
+        "\\documentclass{article}",
+        "\\usepackage[active,tightpage]{preview}",
+        tex_template.preamble,
+        "\\pagestyle{empty}",
+        "\\setlength{\\parindent}{0pt}",
+        "\\begin{document}",
+        tex_template.post_doc_commands,
+        pages,
+        "\\end{document}",
+    ])
+    try:
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            f.write(document)
+        if subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+            return None
+        dvi_file = os.path.join(tex_dir, stem + tex_template.output_format)
+        svg_pattern = os.path.join(tex_dir, stem + "-%p.svg")
+        svg_command = ["dvisvgm", *(["--pdf"] if tex_template.output_format == ".pdf" else []), "--page=1-", "--no-fonts", "--verbosity=0", f"--output={svg_pattern}", dvi_file]
+        subprocess.run(svg_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        page_re = re.compile(re.escape(stem) + r"-(\d+)\.svg$")
+        page_files: Dict[int, str] = {}
+        for name in os.listdir(tex_dir):
+            m = page_re.match(name)
+            if m: page_files[int(m.group(1))] = os.path.join(tex_dir, name)
+        if sorted(page_files) != list(range(1, len(pending) + 1)):
+            for path in page_files.values():
+                try: os.remove(path)
+                except OSError: pass
+            return None
+
+        svg_files: Dict[str, str] = {}
+        for page, latex_text in enumerate(pending, start=1):
+            svg_file = os.path.join(tex_dir, tex_cache_key(latex_text, template_hash) + ".svg")
+            os.replace(page_files[page], svg_file)
+            svg_files[latex_text] = svg_file
+        return svg_files
+    except OSError:
+        return None
+    finally:
+        for ext in (".tex", ".dvi", ".xdv", ".pdf", ".log", ".aux"):
+            try: os.remove(os.path.join(tex_dir, stem + ext))
+            except OSError: pass
+
+# === Mathtext 预览栅格化 ===
+class MathTextRasterizer:
+    """复用 Agg 画布直接输出 RGBA 缓冲区，结果按 (公式, 颜色, 字号) 缓存；不依赖 pyplot 全局状态，可在多线程中使用
+
+    颜色须是 matplotlib 可识别的颜色 (十六进制或 CSS 颜色名)，Manim 颜色名由调用方预先解析。
+    """
+    DPI = 100
+    PAD_PIXELS = 10
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._cache: "OrderedDict[Tuple[str, str, int], Tuple[bytes, int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _import_matplotlib() -> None:
+        import matplotlib
+        matplotlib.rcParams.update({
+            "text.usetex": False,
+            "font.family": "Consolas",
+            "mathtext.fontset": "cm",
+            "figure.dpi": 150,
+        })
+
+    def _get_canvas(self) -> Tuple["Figure", "FigureCanvasAgg", Any]:
+        state = getattr(self._local, "state", None)
+        if state is None:
+            if "matplotlib.figure" not in sys.modules: self._import_matplotlib()
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=(2, 2), dpi=self.DPI)
+            fig.patch.set_alpha(0)
+            canvas = FigureCanvasAgg(fig)
+            text = fig.text(0, 0, "", ha='left', va='bottom')
+            state = self._local.state = (fig, canvas, text)
+        return state
+
+    def get(self, latex_text: str, color_str: str, font_size: int = 20) -> Optional[Tuple[bytes, int, int]]:
+        key = (latex_text, color_str, font_size)
+        with self._lock:
+            rgba = self._cache.get(key)
+            if rgba is not None: self._cache.move_to_end(key)
+            return rgba
+
+    def put(self, latex_text: str, color_str: str, font_size: int, rgba: Tuple[bytes, int, int]) -> None:
+        with self._lock:
+            self._cache[(latex_text, color_str, font_size)] = rgba
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def render(self, latex_text: str, color_str: str, font_size: int = 20) -> Tuple[Optional[Tuple[bytes, int, int]], Optional[str]]:
+        rgba = self.get(latex_text, color_str, font_size)
+        if rgba is not None: return rgba, None
+        fig, canvas, text = self._get_canvas()
+        try:
+            text.set_text(f"${latex_text}$")
+            text.set_color(color_str)
+            text.set_fontsize(font_size)
+            # 先测量公式尺寸，再把画布缩到公式大小，等价于 bbox_inches='tight'
+            bbox = text.get_window_extent(canvas.get_renderer())
+            width = int(bbox.width + 0.999) + 2 * self.PAD_PIXELS
+            height = int(bbox.height + 0.999) + 2 * self.PAD_PIXELS
+            fig.set_size_inches(width / self.DPI, height / self.DPI)
+            text.set_position((self.PAD_PIXELS / width, self.PAD_PIXELS / height))
+            canvas.draw()
+            buf = canvas.buffer_rgba()
+            rgba = (bytes(buf), buf.shape[1], buf.shape[0])
+        except Exception as e:
+            return None, str(e)
+        self.put(latex_text, color_str, font_size, rgba)
+        return rgba, None
+
+MATHTEXT_RASTERIZER = MathTextRasterizer()
+
+def render_mathtext_rgba(latex_text: str, color_str: str = "#000000") -> Tuple[Optional[Tuple[bytes, int, int]], Optional[str]]:
+    return MATHTEXT_RASTERIZER.render(latex_text, color_str)
+
+# === 编译子进程 ===
+def init_compile_process(tex_dir: str) -> None:
+    load_manim(tex_dir)
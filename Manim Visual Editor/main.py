@@ -1,35 +1,60 @@
 import sys
 import os
+import time
+STARTUP_TIME = time.perf_counter() # 冷启动计时起点
+
+if __name__ == "__main__" and sys.argv[1:2] == ["render"]:
+    # 命令行渲染：在导入 PyQt/manim 之前分流，无图形界面的机器上也能运行
+    from scene_core import cli_main
+    sys.exit(cli_main(sys.argv[2:]))
+
 import uuid
-import copy
 import ctypes
 import json  # 新增
-import winreg as reg
-from dataclasses import dataclass, asdict  # 新增 asdict
-from typing import Optional, List, Tuple, Dict, Any, Callable
-from decimal import Decimal
-from io import BytesIO
-from manim import Text, MathTex, config
-from manim.utils.tex_file_writing import tex_to_svg_file, TexTemplate
+import hashlib
+import threading
+import re
+import multiprocessing
+import importlib.util
+import bisect
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+if sys.platform == "win32":
+    import winreg as reg
+from typing import Optional, List, Tuple, Dict, Any, Callable, Deque
+from collections import OrderedDict, deque
+import numpy as np
 from PyQt6.QtSvg import QSvgRenderer
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QListWidget, QListWidgetItem, QPushButton, QLabel, QLineEdit, 
     QComboBox, QTextEdit, QDialog, QSplitter, QToolBar,
     QGraphicsView, QGraphicsScene, QGraphicsItem, QFormLayout, 
-    QMessageBox, QAbstractItemView, QSizePolicy, QFontComboBox, 
+    QMessageBox, QAbstractItemView, QSizePolicy, QCompleter, 
     QProgressBar, QGraphicsRectItem, QSlider, QToolButton,
-    QScrollArea, QColorDialog, QGraphicsLineItem, QStyleOptionGraphicsItem,
+    QScrollArea, QColorDialog, QStyleOptionGraphicsItem,
     QGraphicsSceneMouseEvent, QStackedWidget, QButtonGroup,
-    QFileDialog
+    QFileDialog, QListView, QStyledItemDelegate, QStyleOptionViewItem,
+    QStyle, QToolTip, QMenu, QCheckBox, QTabWidget, QTableWidget,
+    QTableWidgetItem, QHeaderView
 )
-from PyQt6.QtCore import Qt, QSize, QProcess, pyqtSignal, QRectF, QByteArray, QPointF, QRunnable, QThreadPool, QObject, QTimer
+from PyQt6.QtCore import Qt, QSize, QProcess, pyqtSignal, QRectF, QByteArray, QPointF, QLineF, QRunnable, QThreadPool, QObject, QTimer, QRect, QPoint, QEvent, QAbstractListModel, QAbstractItemModel, QModelIndex, QStringListModel, QItemSelection, QItemSelectionModel, QUrl
 from PyQt6.QtGui import (
     QAction, QColor, QBrush, QPainter, QPixmap, QFont, QIcon, QMovie, 
-    QPen, QFontMetrics, QKeySequence, QImage, QWheelEvent, QMouseEvent
+    QPen, QFontMetrics, QKeySequence, QImage, QWheelEvent, QMouseEvent, QDesktopServices, QTextCursor, QFontDatabase,
+    QStaticText, QTransform
 )
 import qtawesome as qta
-import matplotlib.pyplot as plt
+from scene_core import (
+    CURRENT_DIR, RENDER_SHARD_WORKERS, QUALITY_MAP,
+    MobjectData, AnimationData, MOBJECT_FIELD_INDEX, SceneState,
+    ProjectReader, diff_scene_states, replay_journal, write_project_file, write_file_atomic,
+    ScriptGenerator, SEGMENT_CACHE, SectionRenderPlan, sweep_render_work_dirs
+)
+from compile_core import (
+    TEX_DIR, tex_template_hash, tex_cache_key, measure_manim_unit_per_pixel, compile_latex_svgs,
+    MATHTEXT_RASTERIZER, render_mathtext_rgba, init_compile_process
+)
 
 if sys.platform == "win32":
     try:
@@ -38,22 +63,8 @@ if sys.platform == "win32":
         pass
 
 # === 配置与环境初始化 ===
+# manim、matplotlib 导入耗时较长，均在首次使用时才导入 (见 compile_core)
 os.environ["QT_API"] = "pyqt6"
-config.tex_dir = os.path.join(os.path.dirname(__file__), "tex_cache")
-
-plt.rcParams.update({
-    "text.usetex": False,
-    "font.family": "Consolas",
-    "mathtext.fontset": "cm",
-    "figure.dpi": 150,
-})
-
-QUALITY_MAP = {
-    "480p (854*480)": "854,480",
-    "720p (1280*720)": "1280,720",
-    "1080p (1920*1080)": "1920,1080",
-    "4K (3840*2160)": "3840,2160"
-}
 
 MANIM_COLORS_DICT = {
     "WHITE": "#FFFFFF",
@@ -149,18 +160,29 @@ MANIM_COLORS_LIST = list(MANIM_COLORS_DICT.keys())
 CANVAS_WIDTH: int = 960
 CANVAS_HEIGHT: int = 540
 BASE_TEXT_SIZE: int = 32
-MANIM_UNIT_PER_PIXEL: Decimal = Decimal(str(MathTex("x").height)) / Decimal(str(QSvgRenderer(str(tex_to_svg_file("$x$", tex_template=TexTemplate()))).viewBoxF().height()))
 SNAP_THRESHOLD_PIXELS: float = 10.0
-AVAILABLE_FONTS: List[str] = Text.font_list()
-CURRENT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+TEX_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+TEX_CACHE_MAX_AGE_DAYS: float = 30.0
+RENDER_MAX_WORKERS: int = max(2, (os.cpu_count() or 4) // 2)
+COMPILE_PROCESS_WORKERS: int = RENDER_MAX_WORKERS # 编译子进程按需启动，提交编译的后台线程不超过此数；0 表示禁用多进程编译，在线程内直接编译
 
 # 设置
 FILE_EXTENSION = ".manim"
 FILE_DESCRIPTION = "Manim Project File"
 EDITOR_ICON = "icon.ico"
 FILE_ICON = "file.ico"
+AUTOSAVE_DIR = os.path.join(CURRENT_DIR, "autosave")
+AUTOSAVE_INTERVAL_MS = 60 * 1000
+AUTOSAVE_JOURNAL_MAX_ENTRIES = 20 # 追加这么多条增量日志后改写一次完整检查点
+STARTUP_CACHE_FILE = os.path.join(CURRENT_DIR, "startup_cache.json")
+PROVISIONAL_MANIM_UNIT_PER_PIXEL = 48 / 960 # 校准完成前的估算值: MathTex 默认字号 48 × 每磅 1/960 单位
+STARTUP_BUDGET_SECONDS = 1.0 # 启动到首个窗口显示的耗时预算，超出时在控制台提示
 
 # === 辅助函数 ===
+def remove_file(path: str) -> None:
+    try: os.remove(path)
+    except FileNotFoundError: pass
+
 def findfile(file_name: str, search_dir: str = CURRENT_DIR) -> Optional[str]:
     for root, dirs, files in os.walk(search_dir):
         if file_name in files:
@@ -173,70 +195,912 @@ def get_qt_color(color_name: str) -> QColor:
     qt_c = QColor(color_name)
     return qt_c if qt_c.isValid() else QColor("#FFFFFF")
 
+# === 启动缓存 ===
+class StartupCache:
+    """启动相关的昂贵计算结果 (单位换算系数、模板哈希、字体列表) 的磁盘缓存，每项附带指纹，指纹不符时重新计算"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._data: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def get(self, name: str, fingerprint: str) -> Any:
+        with self._lock:
+            entry = self._load().get(name)
+        return entry["value"] if isinstance(entry, dict) and entry.get("fingerprint") == fingerprint else None
+
+    def put(self, name: str, fingerprint: str, value: Any) -> None:
+        with self._lock:
+            data = self._load()
+            data[name] = {"fingerprint": fingerprint, "value": value}
+            try:
+                write_file_atomic(self.path, lambda f: json.dump(data, f, ensure_ascii=False), binary=False)
+            except OSError:
+                pass
+
+    def get_or_compute(self, name: str, fingerprint: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(name, fingerprint)
+        if value is None:
+            value = compute()
+            self.put(name, fingerprint, value)
+        return value
+
+STARTUP_CACHE = StartupCache(STARTUP_CACHE_FILE)
+
+_manim_version: Optional[str] = None
+
+def manim_version() -> str:
+    # 只读取包元数据，不导入 manim
+    global _manim_version
+    if _manim_version is None:
+        from importlib.metadata import version, PackageNotFoundError
+        try: _manim_version = version("manim")
+        except PackageNotFoundError: _manim_version = "unknown"
+    return _manim_version
+
+_manim_unit_per_pixel: Optional[float] = None
+_unit_calibration: Optional["UnitCalibrationWorker"] = None
+_unit_calibration_listeners: List[Callable[[], None]] = []
+
+def get_manim_unit_per_pixel() -> float:
+    # 优先使用按 manim 版本缓存到磁盘的校准值；缓存缺失时先返回估算值，在后台校准，完成后通知监听者重算几何
+    global _manim_unit_per_pixel, _unit_calibration
+    if _manim_unit_per_pixel is None:
+        _manim_unit_per_pixel = STARTUP_CACHE.get("manim_unit_per_pixel", manim_version())
+    if _manim_unit_per_pixel is not None:
+        return _manim_unit_per_pixel
+    if _unit_calibration is None:
+        _unit_calibration = UnitCalibrationWorker()
+        _unit_calibration.signals.finished.connect(on_unit_calibrated)
+        QThreadPool.globalInstance().start(_unit_calibration)
+    return PROVISIONAL_MANIM_UNIT_PER_PIXEL
+
+def on_unit_calibrated(value: Optional[float], error: Optional[str]) -> None:
+    global _manim_unit_per_pixel
+    if value is None: return # 校准失败时继续使用估算值，下次启动再试
+    _manim_unit_per_pixel = value
+    STARTUP_CACHE.put("manim_unit_per_pixel", manim_version(), value)
+    for listener in list(_unit_calibration_listeners):
+        listener()
+
+def add_unit_calibration_listener(listener: Callable[[], None]) -> None:
+    _unit_calibration_listeners.append(listener)
+
+def font_dirs_fingerprint() -> str:
+    # 系统字体目录 (及其一级子目录) 的修改时间，安装或删除字体后随之变化
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        dirs = [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+                os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts")]
+    elif sys.platform == "darwin":
+        dirs = ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    else:
+        dirs = ["/usr/share/fonts", "/usr/local/share/fonts", os.path.join(home, ".fonts"), os.path.join(home, ".local", "share", "fonts")]
+    h = hashlib.sha256()
+    for d in dirs:
+        try:
+            h.update(f"{d}\0{os.stat(d).st_mtime_ns}\0".encode("utf-8"))
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        h.update(f"{entry.path}\0{entry.stat().st_mtime_ns}\0".encode("utf-8"))
+        except OSError:
+            pass
+    return h.hexdigest()[:16]
+
+_available_fonts: Optional[List[str]] = None
+
+def get_available_fonts() -> List[str]:
+    # Pango 可用的字体族 (即 manim Text 可用的字体)，直接调用 manimpango 而不导入 manim
+    global _available_fonts
+    if _available_fonts is None:
+        def enumerate_fonts() -> List[str]:
+            import manimpango
+            return sorted(manimpango.list_fonts())
+        _available_fonts = STARTUP_CACHE.get_or_compute("available_fonts", font_dirs_fingerprint(), enumerate_fonts)
+    return _available_fonts
+
+def rgba_to_image(rgba: Tuple[bytes, int, int]) -> QImage:
+    data, width, height = rgba
+    # 直接包装缓冲区，不复制像素；引用挂在 QImage 上保证缓冲区存活
+    image = QImage(data, width, height, width * 4, QImage.Format.Format_RGBA8888)
+    image.rgba_buffer = data
+    return image
+
 def render_latex_to_pixmap_mpl(latex_text: str, color_str: str = "#000000") -> Tuple[QPixmap, Optional[str]]:
     if not latex_text.strip():
         return QPixmap(), None
-    fig = None
-    try:
-        fig = plt.figure(figsize=(2, 2), dpi=100) 
-        fig.patch.set_alpha(0)
-        c = get_qt_color(color_str)
-        mpl_color = c.name()
-        fig.text(0.5, 0.5, f"${latex_text}$", ha='center', va='center', fontsize=20, color=mpl_color)
-        buf = BytesIO()
-        fig.savefig(buf, format='png', bbox_inches='tight', pad_inches=0.1, facecolor='none', dpi=100)
-        buf.seek(0)
-        image = QImage()
-        image.loadFromData(buf.getvalue())
-        plt.close(fig)
-        buf.close()
-        if image.isNull(): return QPixmap(), "Render Error: Image is null"
-        return QPixmap.fromImage(image), None
-    except Exception as e:
-        if fig: plt.close(fig)
-        return QPixmap(), str(e)
+    rgba, error = render_mathtext_rgba(latex_text, get_qt_color(color_str).name())
+    if error: return QPixmap(), error
+    return QPixmap.fromImage(rgba_to_image(rgba)), None
+
+# === LaTeX SVG 缓存 ===
+class TexSvgCache:
+    """进程内 LaTeX SVG 缓存：键为 (LaTeX 源码, 模板哈希)，值为未着色的 SVG"""
+
+    def __init__(self, max_entries: int = 2048) -> None:
+        self.max_entries = max_entries
+        # 值为 (<svg 之前的部分, <svg 之后的部分)，着色时只需拼接 fill 属性
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, latex_text: str, template_hash: str) -> Optional[Tuple[str, str]]:
+        key = (latex_text, template_hash)
+        with self._lock:
+            parts = self._entries.get(key)
+            if parts is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return parts
+
+    def peek(self, latex_text: str, template_hash: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            return self._entries.get((latex_text, template_hash))
+
+    def contains(self, latex_text: str, template_hash: str) -> bool:
+        with self._lock:
+            return (latex_text, template_hash) in self._entries
+
+    def put(self, latex_text: str, template_hash: str, svg_data: str) -> Tuple[str, str]:
+        head, sep, tail = svg_data.partition("<svg ")
+        parts = (head, tail) if sep else (svg_data, "")
+        with self._lock:
+            self._entries[(latex_text, template_hash)] = parts
+            self._entries.move_to_end((latex_text, template_hash))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return parts
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def colorize(parts: Tuple[str, str], color_str: str) -> bytes:
+        head, tail = parts
+        if not tail: return head.encode('utf-8')
+        hex_color = get_qt_color(color_str).name()
+        return f'{head}<svg fill="{hex_color}" stroke="none" {tail}'.encode('utf-8')
+
+class TexDiskCache:
+    """tex_cache 目录的磁盘索引：哈希 -> SVG 路径、大小、最后访问时间，并按大小/时间淘汰"""
+
+    def __init__(self, cache_dir: str, index_path: str, max_bytes: int = TEX_CACHE_MAX_BYTES, max_age_days: float = TEX_CACHE_MAX_AGE_DAYS) -> None:
+        self.cache_dir = os.path.abspath(cache_dir)
+        # 索引不能放在 tex_cache 内部，manim 编译后会清理其中非 .svg/.tex 文件
+        self.index_path = index_path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(latex_text: str, template_hash: str) -> str:
+        return tex_cache_key(latex_text, template_hash)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == 1:
+                self._entries = data.get("entries", {})
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty: return
+            data = {"version": 1, "entries": dict(self._entries)}
+            self._dirty = 0
+        tmp_path = self.index_path + ".tmp"
+        with self._flush_lock:
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.index_path)
+            except OSError:
+                pass
+
+    def _mark_dirty(self) -> None:
+        self._dirty += 1
+        if self._dirty >= 32:
+            threading.Thread(target=self.flush, daemon=True).start()
+
+    def load(self, latex_text: str, template_hash: str) -> Optional[str]:
+        key = self.make_key(latex_text, template_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None: return None
+        svg_path = os.path.join(self.cache_dir, entry["svg"])
+        try:
+            with open(svg_path, 'r', encoding='utf-8') as f:
+                svg_data = f.read()
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+                self._mark_dirty()
+            return None
+        with self._lock:
+            entry["last_access"] = time.time()
+            self._mark_dirty()
+        return svg_data
+
+    def store(self, latex_text: str, template_hash: str, svg_path: str) -> None:
+        svg_path = os.path.abspath(str(svg_path))
+        stem = os.path.splitext(svg_path)[0]
+        size = 0
+        for ext in (".svg", ".tex"):
+            try: size += os.path.getsize(stem + ext)
+            except OSError: pass
+        with self._lock:
+            self._entries[self.make_key(latex_text, template_hash)] = {
+                "svg": os.path.relpath(svg_path, self.cache_dir),
+                "size": size,
+                "last_access": time.time(),
+            }
+            self._mark_dirty()
+
+    def preload(self, latex_texts: List[str], memory_cache: TexSvgCache, template_hash: str) -> int:
+        # 打开项目时预热：把项目引用到的公式从磁盘读入内存缓存
+        loaded = 0
+        for latex_text in dict.fromkeys(latex_texts):
+            if not latex_text.strip() or memory_cache.contains(latex_text, template_hash): continue
+            svg_data = self.load(latex_text, template_hash)
+            if svg_data is not None:
+                memory_cache.put(latex_text, template_hash, svg_data)
+                loaded += 1
+        return loaded
+
+    def _remove_files(self, rel_svg: str) -> None:
+        stem = os.path.splitext(os.path.join(self.cache_dir, rel_svg))[0]
+        for ext in (".svg", ".tex"):
+            try: os.remove(stem + ext)
+            except OSError: pass
+
+    def evict(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if now - e.get("last_access", 0) > self.max_age_seconds]
+            removed = [self._entries.pop(k) for k in expired]
+            total = sum(e.get("size", 0) for e in self._entries.values())
+            if total > self.max_bytes:
+                for k in sorted(self._entries, key=lambda k: self._entries[k].get("last_access", 0)):
+                    if total <= self.max_bytes: break
+                    entry = self._entries.pop(k)
+                    total -= entry.get("size", 0)
+                    removed.append(entry)
+            indexed = {os.path.splitext(e["svg"])[0] for e in self._entries.values()}
+            if removed: self._dirty += 1
+        for entry in removed:
+            self._remove_files(entry["svg"])
+        # 清理索引之外的过期文件（旧版本遗留或编译中断的中间文件）
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for f in it:
+                    if not f.is_file(): continue
+                    if os.path.splitext(f.name)[0] in indexed: continue
+                    if now - f.stat().st_mtime > self.max_age_seconds:
+                        try: os.remove(f.path)
+                        except OSError: pass
+        except OSError:
+            pass
+        self.flush()
+        return len(removed)
+
+TEX_SVG_CACHE = TexSvgCache()
+TEX_DISK_CACHE = TexDiskCache(TEX_DIR, os.path.join(CURRENT_DIR, "tex_cache_index.json"))
+_tex_template_hash: Optional[str] = None
+_tex_template_hash_lock = threading.Lock()
+
+def get_tex_template_hash() -> Optional[str]:
+    # 查询缓存只需要模板哈希，按 manim 版本缓存到磁盘；缓存缺失 (首次运行或升级 manim 后) 时返回 None，不在调用线程中导入 manim
+    global _tex_template_hash
+    if _tex_template_hash is None:
+        _tex_template_hash = STARTUP_CACHE.get("tex_template_hash", manim_version())
+    return _tex_template_hash
+
+def require_tex_template_hash() -> str:
+    # 缓存缺失时在编译子进程中计算，调用线程等待结果；只在后台线程 (编译、加载公式) 中调用
+    global _tex_template_hash
+    with _tex_template_hash_lock:
+        if get_tex_template_hash() is None:
+            _tex_template_hash = STARTUP_CACHE.get_or_compute("tex_template_hash", manim_version(), lambda: get_compile_process_pool().run(tex_template_hash))
+    return _tex_template_hash
+
+def get_latex_svg_bytes(latex_text: str, color_str: str) -> bytes:
+    template_hash = require_tex_template_hash()
+    parts = TEX_SVG_CACHE.get(latex_text, template_hash)
+    if parts is None:
+        error = compile_latex_batch([latex_text]).get(latex_text)
+        if error: raise ValueError(error)
+        parts = TEX_SVG_CACHE.peek(latex_text, template_hash)
+        if parts is None:
+            svg_data = TEX_DISK_CACHE.load(latex_text, template_hash)
+            if svg_data is None: raise FileNotFoundError("LaTeX Compile Failed: File not found")
+            parts = TEX_SVG_CACHE.put(latex_text, template_hash, svg_data)
+    return TexSvgCache.colorize(parts, color_str)
+
+def is_latex_cached(latex_text: str) -> bool:
+    # 模板哈希未知时视为未缓存，公式交给后台加载
+    template_hash = get_tex_template_hash()
+    return template_hash is not None and TEX_SVG_CACHE.contains(latex_text, template_hash)
+
+def compile_latex_batch(latex_texts: List[str]) -> Dict[str, Optional[str]]:
+    """把所有未缓存的公式放进一个多页文档，只运行一次 LaTeX + dvisvgm，返回 {公式: 错误信息}"""
+    template_hash = require_tex_template_hash()
+    pending = [t for t in dict.fromkeys(latex_texts) if t.strip() and not TEX_SVG_CACHE.contains(t, template_hash)]
+    if pending:
+        TEX_DISK_CACHE.preload(pending, TEX_SVG_CACHE, template_hash)
+        pending = [t for t in pending if not TEX_SVG_CACHE.contains(t, template_hash)]
+    if not pending: return {}
+    # 编译在子进程中进行，缓存只由主进程写入
+    results = get_compile_process_pool().compile_latex(pending)
+    errors: Dict[str, Optional[str]] = {}
+    for latex_text, (svg_path, svg_data, error) in results.items():
+        if error is None:
+            TEX_SVG_CACHE.put(latex_text, template_hash, svg_data)
+            TEX_DISK_CACHE.store(latex_text, template_hash, svg_path)
+        errors[latex_text] = error
+    if len(pending) > 1: TEX_DISK_CACHE.flush()
+    return errors
+
+# === 多进程编译后端 ===
+class CompileProcessPool:
+    """常驻的编译子进程池，LaTeX 编译与 mathtext 栅格化都在子进程中执行，绕开主进程的 GIL
+
+    子进程在有任务而没有空闲进程时才启动 (spawn 方式下 ProcessPoolExecutor 按需创建)，只导入无界面的 compile_core。
+    """
+
+    def __init__(self, max_workers: int = COMPILE_PROCESS_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn 子进程默认会以 __mp_main__ 名义重新执行主脚本 (导入 PyQt、qtawesome、numpy)；
+                # 主模块没有 __spec__ 时 (直接运行本脚本) 把它指向 compile_core，子进程改为导入这个无界面模块
+                main_module = sys.modules["__main__"]
+                if getattr(main_module, "__spec__", None) is None:
+                    main_module.__spec__ = importlib.util.find_spec("compile_core")
+                # 使用 spawn，避免 fork 带有 Qt 线程的进程
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_compile_process,
+                    initargs=(os.path.abspath(TEX_DIR),),
+                )
+            return self._executor
+
+    def run(self, fn: Callable, *args: Any) -> Any:
+        # 只有进程池本身不可用时才退回到当前线程编译，fn 自身抛出的异常照常传给调用者
+        if self.enabled:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except (OSError, ValueError, BrokenProcessPool):
+                # 进程池无法启动，本次会话不再使用子进程
+                self.disable()
+                return fn(*args)
+            except RuntimeError:
+                # 进程池刚被其他线程关闭
+                return fn(*args)
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # 子进程崩溃
+                self.disable()
+            except CancelledError:
+                pass # 进程池被其他线程关闭，任务已取消
+        return fn(*args)
+
+    def disable(self) -> None:
+        self.shutdown()
+        self.max_workers = 0
+
+    def compile_latex(self, latex_texts: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str], Optional[str]]]:
+        return self.run(compile_latex_svgs, latex_texts)
+
+    def render_mathtext(self, latex_text: str, color_str: str) -> Tuple[Optional[Tuple[bytes, int, int]], Optional[str]]:
+        # Manim 颜色名在主进程中解析为十六进制，子进程无需 Qt
+        color_str = get_qt_color(color_str).name()
+        rgba = MATHTEXT_RASTERIZER.get(latex_text, color_str)
+        if rgba is not None: return rgba, None
+        rgba, error = self.run(render_mathtext_rgba, latex_text, color_str)
+        if rgba is not None: MATHTEXT_RASTERIZER.put(latex_text, color_str, 20, rgba)
+        return rgba, error
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+_compile_process_pool: Optional[CompileProcessPool] = None
+
+def get_compile_process_pool() -> CompileProcessPool:
+    global _compile_process_pool
+    if _compile_process_pool is None:
+        _compile_process_pool = CompileProcessPool()
+    return _compile_process_pool
 
 def create_manim_svg_renderer(latex_text: str, color_str: str) -> Tuple[Optional[QSvgRenderer], Optional[str]]:
     if not latex_text.strip(): return None, None
     try:
-        tex_template = TexTemplate()
-        svg_file = tex_to_svg_file(f"${latex_text}$", tex_template=tex_template)
-        if not os.path.exists(svg_file): return None, "LaTeX Compile Failed"
-        with open(svg_file, 'r', encoding='utf-8') as f:
-            svg_data = f.read()
-        qt_color = get_qt_color(color_str)
-        hex_color = qt_color.name()
-        if "<svg " in svg_data:
-            svg_data = svg_data.replace("<svg ", f'<svg fill="{hex_color}" stroke="none" ')
-        renderer = QSvgRenderer(QByteArray(svg_data.encode('utf-8')))
+        svg_bytes = get_latex_svg_bytes(latex_text, color_str)
+        renderer = QSvgRenderer(QByteArray(svg_bytes))
         if not renderer.isValid(): return None, "Invalid SVG Data"
         return renderer, None
     except Exception as e:
         return None, str(e)
 
-# === 数据类 ===
-@dataclass
-class MobjectData:
-    id: str
-    name: str
-    mob_type: str 
-    color: str
-    content: str = "" 
-    font: str = "Arial" 
-    x: float = 0.0
-    y: float = 0.0
-    scale: float = 1.0
-    visible: bool = True 
-
-@dataclass
-class AnimationData:
-    id: str
-    anim_type: str 
-    target_id: str
-    target_name_snapshot: str 
-    replacement_id: Optional[str] = None 
-    replacement_name_snapshot: Optional[str] = None
-    duration: float = 1.0 
+# === 场景模型 ===
+class MobjectColumns:
+    """对象数值字段的列式视图 (x, y, scale, visible)：批量对齐/分布/变换用 NumPy 向量运算完成，最后一次写回发生变化的对象
+
+    left/right/bottom/top 为包围盒边缘相对对象中心的偏移 (单位与 x/y 相同)，默认为 0 即按中心点计算。
+    """
+
+    def __init__(self, mobjects: List[MobjectData]) -> None:
+        self.mobjects = mobjects
+        n = len(mobjects)
+        self.x = np.fromiter((m.x for m in mobjects), dtype=np.float64, count=n)
+        self.y = np.fromiter((m.y for m in mobjects), dtype=np.float64, count=n)
+        self.scale = np.fromiter((m.scale for m in mobjects), dtype=np.float64, count=n)
+        self.visible = np.fromiter((m.visible for m in mobjects), dtype=bool, count=n)
+        self.left = np.zeros(n)
+        self.right = np.zeros(n)
+        self.bottom = np.zeros(n)
+        self.top = np.zeros(n)
+
+    def set_extents(self, left: np.ndarray, right: np.ndarray, bottom: np.ndarray, top: np.ndarray) -> None:
+        self.left, self.right, self.bottom, self.top = left, right, bottom, top
+
+    def _axis(self, axis: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if axis == "x": return self.x, self.left, self.right
+        return self.y, self.bottom, self.top
+
+    def align(self, edge: str) -> None:
+        # edge: left/right/h_center 或 bottom/top/v_center
+        axis = "x" if edge in ("left", "right", "h_center") else "y"
+        pos, lo, hi = self._axis(axis)
+        if len(pos) == 0: return
+        if edge in ("left", "bottom"):
+            pos[:] = (pos + lo).min() - lo
+        elif edge in ("right", "top"):
+            pos[:] = (pos + hi).max() - hi
+        else:
+            center = ((pos + lo).min() + (pos + hi).max()) / 2
+            pos[:] = center - (lo + hi) / 2
+
+    def distribute(self, axis: str) -> None:
+        # 保持首尾对象不动，使相邻包围盒之间的间距相等
+        pos, lo, hi = self._axis(axis)
+        if len(pos) < 3: return
+        order = np.argsort(pos + lo, kind="stable")
+        sizes = (hi - lo)[order]
+        start = (pos + lo).min()
+        gap = ((pos + hi).max() - start - sizes.sum()) / (len(pos) - 1)
+        edges = start + np.concatenate(([0.0], np.cumsum(sizes[:-1] + gap)))
+        pos[order] = edges - lo[order]
+
+    def transform(self, dx: float = 0.0, dy: float = 0.0, factor: float = 1.0) -> None:
+        # 以整体包围盒中心为基准缩放，然后平移
+        if len(self.x) == 0: return
+        cx = ((self.x + self.left).min() + (self.x + self.right).max()) / 2
+        cy = ((self.y + self.bottom).min() + (self.y + self.top).max()) / 2
+        self.x[:] = cx + (self.x - cx) * factor + dx
+        self.y[:] = cy + (self.y - cy) * factor + dy
+        self.scale *= factor
+        for arr in (self.left, self.right, self.bottom, self.top):
+            arr *= factor
+
+    def write_back(self) -> List[MobjectData]:
+        # 与画布提交位置时一致保留两位小数；只写回实际变化的对象，以免无谓地使快照失效
+        xs = np.round(self.x, 2).tolist()
+        ys = np.round(self.y, 2).tolist()
+        scales = np.round(self.scale, 2).tolist()
+        visible = self.visible.tolist()
+        changed = []
+        for mob, x, y, s, v in zip(self.mobjects, xs, ys, scales, visible):
+            if (mob.x, mob.y, mob.scale, mob.visible) != (x, y, s, v):
+                mob.x, mob.y, mob.scale, mob.visible = x, y, s, v
+                changed.append(mob)
+        return changed
+
+class SceneModel:
+    """场景数据的唯一持有者：按顺序保存对象与动画，维护 id/名称索引及 对象→引用它的动画 的反向索引，变更时通知监听者
+
+    事件: mobject_added / mobject_removed / mobject_changed / animation_added / animation_removed / animation_changed
+    携带对应的数据对象；reset 携带替换前的 (对象列表, 动画列表)。
+    """
+
+    def __init__(self) -> None:
+        self.mobjects: List[MobjectData] = []
+        self.animations: List[AnimationData] = []
+        self._mobs: Dict[str, MobjectData] = {}
+        self._anims: Dict[str, AnimationData] = {}
+        self._mob_names: Dict[str, List[str]] = {}
+        # 动画按其引用的对象 id 与名称快照建立反向索引 (目标与替换对象都计入)
+        self._deps_by_id: Dict[str, set] = {}
+        self._deps_by_name: Dict[str, set] = {}
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+    def add_listener(self, callback: Callable[[str, Any], None]) -> None:
+        self._listeners.append(callback)
+
+    def _emit(self, event: str, payload: Any) -> None:
+        for callback in list(self._listeners):
+            callback(event, payload)
+
+    # --- 查询 ---
+    def mobject(self, mob_id: Optional[str]) -> Optional[MobjectData]:
+        return self._mobs.get(mob_id) if mob_id else None
+
+    def animation(self, anim_id: Optional[str]) -> Optional[AnimationData]:
+        return self._anims.get(anim_id) if anim_id else None
+
+    def mobject_by_name(self, name: Optional[str]) -> Optional[MobjectData]:
+        ids = self._mob_names.get(name) if name else None
+        return self._mobs[ids[0]] if ids else None
+
+    def dependents(self, mob_id: str) -> List[AnimationData]:
+        return [self._anims[aid] for aid in self._deps_by_id.get(mob_id, ())]
+
+    # --- 索引维护 ---
+    def _index_mobject(self, mob: MobjectData) -> None:
+        self._mobs[mob.id] = mob
+        self._mob_names.setdefault(mob.name, []).append(mob.id)
+
+    def _unindex_mobject(self, mob: MobjectData) -> None:
+        self._mobs.pop(mob.id, None)
+        ids = self._mob_names.get(mob.name)
+        if ids and mob.id in ids:
+            ids.remove(mob.id)
+            if not ids: del self._mob_names[mob.name]
+
+    def _anim_refs(self, anim: AnimationData) -> Tuple[Tuple[Optional[str], ...], Tuple[Optional[str], ...]]:
+        return (anim.target_id, anim.replacement_id), (anim.target_name_snapshot, anim.replacement_name_snapshot)
+
+    def _index_animation(self, anim: AnimationData) -> None:
+        self._anims[anim.id] = anim
+        ids, names = self._anim_refs(anim)
+        for key in ids:
+            if key: self._deps_by_id.setdefault(key, set()).add(anim.id)
+        for key in names:
+            if key: self._deps_by_name.setdefault(key, set()).add(anim.id)
+
+    def _unindex_animation(self, anim: AnimationData) -> None:
+        self._anims.pop(anim.id, None)
+        ids, names = self._anim_refs(anim)
+        for index, keys in ((self._deps_by_id, ids), (self._deps_by_name, names)):
+            for key in keys:
+                deps = index.get(key)
+                if deps is not None:
+                    deps.discard(anim.id)
+                    if not deps: del index[key]
+
+    def _candidates(self, mob: MobjectData, *names: str) -> set:
+        result = set(self._deps_by_id.get(mob.id, ()))
+        for name in (mob.name,) + names:
+            result.update(self._deps_by_name.get(name, ()))
+        return result
+
+    def _rebind(self, anim_ids: set) -> None:
+        # 目标 id 丢失时按名称快照重新绑定同名对象，并让名称快照跟随对象改名；受影响的动画都会收到通知
+        for aid in anim_ids:
+            anim = self._anims.get(aid)
+            if anim is None: continue
+            target_obj = self.mobject(anim.target_id) or self.mobject_by_name(anim.target_name_snapshot)
+            changes: Dict[str, Any] = {}
+            if target_obj:
+                changes["target_id"] = target_obj.id
+                changes["target_name_snapshot"] = target_obj.name
+            if anim.anim_type == "Transform":
+                rep_obj = self.mobject(anim.replacement_id)
+                if not rep_obj and anim.replacement_name_snapshot:
+                    rep_obj = self.mobject_by_name(anim.replacement_name_snapshot)
+                if rep_obj:
+                    changes["replacement_id"] = rep_obj.id
+                    changes["replacement_name_snapshot"] = rep_obj.name
+            self.update_animation(anim, **changes)
+
+    # --- 修改 ---
+    def add_mobject(self, mob: MobjectData) -> None:
+        self.mobjects.append(mob)
+        self._index_mobject(mob)
+        self._emit("mobject_added", mob)
+        self._rebind(self._candidates(mob))
+
+    def remove_mobject(self, mob_id: str) -> Optional[MobjectData]:
+        mob = self._mobs.get(mob_id)
+        if mob is None: return None
+        self.mobjects.remove(mob)
+        self._unindex_mobject(mob)
+        self._emit("mobject_removed", mob)
+        self._rebind(self._candidates(mob))
+        return mob
+
+    def update_mobject(self, mob: MobjectData, **changes: Any) -> None:
+        old_name = mob.name
+        if "name" in changes: self._unindex_mobject(mob)
+        for name, value in changes.items():
+            setattr(mob, name, value)
+        if "name" in changes: self._index_mobject(mob)
+        self._emit("mobject_changed", mob)
+        if "name" in changes: self._rebind(self._candidates(mob, old_name))
+
+    def add_animation(self, anim: AnimationData) -> None:
+        self.animations.append(anim)
+        self._index_animation(anim)
+        self._emit("animation_added", anim)
+
+    def remove_animation(self, anim_id: str) -> Optional[AnimationData]:
+        anim = self._anims.get(anim_id)
+        if anim is None: return None
+        self.animations.remove(anim)
+        self._unindex_animation(anim)
+        self._emit("animation_removed", anim)
+        return anim
+
+    def update_animation(self, anim: AnimationData, **changes: Any) -> None:
+        self._unindex_animation(anim)
+        for name, value in changes.items():
+            setattr(anim, name, value)
+        self._index_animation(anim)
+        self._emit("animation_changed", anim)
+
+    def replace(self, mobjects: List[MobjectData], animations: List[AnimationData]) -> None:
+        # 整体替换 (撤销/重做/打开项目)：仅为实例发生变化的条目更新索引
+        old_mobs, old_anims = self.mobjects, self.animations
+        new_mob_ids = {m.id for m in mobjects}
+        new_anim_ids = {a.id for a in animations}
+        old_anim_map = {a.id: a for a in old_anims}
+        for anim in old_anims:
+            if anim.id not in new_anim_ids: self._unindex_animation(anim)
+        for anim in animations:
+            old = old_anim_map.get(anim.id)
+            if old is not anim:
+                if old is not None: self._unindex_animation(old)
+                self._index_animation(anim)
+        old_mob_map = {m.id: m for m in old_mobs}
+        touched = []
+        for mob in old_mobs:
+            if mob.id not in new_mob_ids:
+                self._unindex_mobject(mob)
+                touched.append(mob)
+        for mob in mobjects:
+            old = old_mob_map.get(mob.id)
+            if old is not mob:
+                if old is not None:
+                    self._unindex_mobject(old)
+                    touched.append(old)
+                self._index_mobject(mob)
+                touched.append(mob)
+        self.mobjects, self.animations = mobjects, animations
+        self._emit("reset", (old_mobs, old_anims))
+        candidates = set()
+        for mob in touched:
+            candidates |= self._candidates(mob)
+        self._rebind(candidates)
+
+# === 渲染队列 ===
+RENDER_JOB_STATUS_TEXT = {"queued": "排队中", "running": "渲染中", "done": "已完成", "failed": "失败", "cancelled": "已取消"}
+
+class RenderJob:
+    """渲染队列中的一个任务：一份渲染计划及其状态、输出日志与正在运行的进程"""
+    _next_id = 1
+
+    def __init__(self, title: str, plan: SectionRenderPlan, preview: bool = False, fingerprint: Optional[str] = None) -> None:
+        self.id = RenderJob._next_id
+        RenderJob._next_id += 1
+        self.title = title
+        self.plan = plan
+        self.preview = preview # 完成后自动打开输出视频
+        self.fingerprint = fingerprint
+        self.status = "queued"
+        self.detail = ""
+        self.log: List[str] = []
+        self.processes: List[QProcess] = []
+        self.pending_commands: List[Tuple[str, List[str]]] = []
+        self.stage_total = 0
+        self.stage_done = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+class RenderQueue(QObject):
+    """渲染任务队列：所有任务共享同一个进程并发上限，按入队顺序调度各任务当前阶段的命令"""
+    job_changed = pyqtSignal(object) # RenderJob
+    job_output = pyqtSignal(object, str) # RenderJob, 输出文本
+    job_finished = pyqtSignal(object) # RenderJob，完成、失败或取消时发出一次
+
+    def __init__(self, max_processes: int, parent=None):
+        super().__init__(parent)
+        self.max_processes = max(1, max_processes)
+        self.jobs: List[RenderJob] = []
+        self.running = 0
+
+    def set_max_processes(self, count: int) -> None:
+        self.max_processes = max(1, count)
+        self._pump()
+
+    def active_jobs(self) -> List[RenderJob]:
+        return [job for job in self.jobs if not job.finished]
+
+    def enqueue(self, job: RenderJob) -> RenderJob:
+        self.jobs.append(job)
+        self.job_changed.emit(job)
+        plan = job.plan
+        # 同一输出文件同时只允许一个任务写入
+        output_path = os.path.abspath(plan.output_path)
+        busy = next((other for other in self.active_jobs() if other is not job and os.path.abspath(other.plan.output_path) == output_path), None)
+        if busy is not None:
+            self._fail(job, f"输出文件正被任务「{busy.title}」使用：{output_path}")
+            return job
+        if plan.sectioned:
+            total = len(plan.section_keys)
+            self._append_log(job, f"分段渲染：共 {total} 段，其中 {total - len(plan.pending_keys)} 段使用缓存，"
+                                  f"其余分为 {len(plan.shards)} 个分片并行渲染\n")
+        else:
+            self._append_log(job, "未找到 ffmpeg，渲染完整场景\n")
+        try:
+            plan.write_script()
+        except Exception as e:
+            self._fail(job, f"写入脚本失败：{e}")
+            return job
+        self._prepare_stage(job)
+        self._pump()
+        return job
+
+    def cancel(self, job: RenderJob) -> None:
+        if job.finished: return
+        job.pending_commands.clear()
+        self._finish(job, "cancelled")
+        for process in list(job.processes):
+            process.kill()
+
+    def remove_finished(self) -> None:
+        self.jobs = [job for job in self.jobs if not job.finished]
+
+    def shutdown(self) -> None:
+        # 退出时取消全部任务并等待进程退出 (期间同步发出 finished)，使各任务的工作目录得以删除
+        for job in self.active_jobs():
+            self.cancel(job)
+        for job in self.jobs:
+            for process in list(job.processes):
+                process.waitForFinished(3000)
+
+    def _prepare_stage(self, job: RenderJob) -> None:
+        try:
+            commands = job.plan.commands()
+        except Exception as e:
+            self._fail(job, str(e))
+            return
+        if not commands:
+            self._finish(job, "done")
+            return
+        job.pending_commands = list(commands)
+        job.stage_total = len(commands)
+        job.stage_done = 0
+        self._update_detail(job)
+
+    def _update_detail(self, job: RenderJob) -> None:
+        if job.plan.stage == "concat":
+            job.detail = "拼接片段"
+        elif job.plan.sectioned:
+            job.detail = f"分片 {job.stage_done}/{job.stage_total}，共 {len(job.plan.pending_keys)}/{len(job.plan.section_keys)} 段待渲染"
+        else:
+            job.detail = "渲染完整场景"
+        self.job_changed.emit(job)
+
+    def _pump(self) -> None:
+        for job in self.jobs:
+            while job.pending_commands and not job.finished and self.running < self.max_processes:
+                program, args = job.pending_commands.pop(0)
+                self._launch(job, program, args)
+            if self.running >= self.max_processes: break
+
+    def _launch(self, job: RenderJob, program: str, args: List[str]) -> None:
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        process.readyReadStandardOutput.connect(lambda j=job, p=process: self._on_output(j, p))
+        process.finished.connect(lambda exit_code, exit_status, j=job, p=process: self._on_finished(j, p, exit_code, exit_status))
+        process.errorOccurred.connect(lambda error, j=job, p=process: self._on_error(j, p, error))
+        job.processes.append(process)
+        self.running += 1
+        if job.status == "queued":
+            job.status = "running"
+            self.job_changed.emit(job)
+        prompt = "Manim" if program == sys.executable else "ffmpeg"
+        self._append_log(job, f"{prompt}> {' '.join(args)}\n")
+        process.start(program, args)
+
+    def _append_log(self, job: RenderJob, text: str) -> None:
+        job.log.append(text)
+        self.job_output.emit(job, text)
+
+    def _on_output(self, job: RenderJob, process: QProcess) -> None:
+        self._append_log(job, bytes(process.readAllStandardOutput()).decode("utf-8", errors="replace"))
+
+    def _on_error(self, job: RenderJob, process: QProcess, error: QProcess.ProcessError) -> None:
+        # 启动失败时不会发出 finished，按失败结束以免占住并发名额
+        if error == QProcess.ProcessError.FailedToStart:
+            self._on_finished(job, process, -1, QProcess.ExitStatus.CrashExit)
+
+    def _on_finished(self, job: RenderJob, process: QProcess, exit_code: int, exit_status: QProcess.ExitStatus) -> None:
+        if process not in job.processes: return
+        self.running -= 1
+        job.processes.remove(process)
+        process.deleteLater()
+        if job.finished:
+            self._cleanup(job)
+        else:
+            if exit_code != 0 or exit_status != QProcess.ExitStatus.NormalExit:
+                # 任一进程失败即终止该任务的其余进程
+                job.pending_commands.clear()
+                self._fail(job, f"进程退出码 {exit_code}")
+                for other in list(job.processes):
+                    other.kill()
+            else:
+                job.stage_done += 1
+                if job.pending_commands or job.processes:
+                    self._update_detail(job)
+                else:
+                    try:
+                        job.plan.stage_finished()
+                    except Exception as e:
+                        self._fail(job, str(e))
+                    else:
+                        self._prepare_stage(job)
+        self._pump()
+
+    def _fail(self, job: RenderJob, error: str) -> None:
+        self._append_log(job, f"\n渲染失败：{error}\n")
+        job.detail = error
+        self._finish(job, "failed")
+
+    def _finish(self, job: RenderJob, status: str) -> None:
+        job.status = status
+        if status == "done":
+            job.detail = job.plan.output_path
+        elif status == "cancelled":
+            job.detail = ""
+        self._cleanup(job)
+        self.job_changed.emit(job)
+        self.job_finished.emit(job)
+
+    def _cleanup(self, job: RenderJob) -> None:
+        # 被终止的进程全部退出后才删除工作目录
+        if job.processes: return
+        job.plan.cleanup()
 
 # === 组件: 侧边菜单按钮 ===
 class SideMenuButton(QToolButton):
@@ -297,6 +1161,135 @@ class RightSideBar(QWidget):
         
         self.btn_group.idClicked.connect(self.mode_changed.emit)
 
+# === 组件: 字体目录与字体选择框 ===
+class FontCatalogWorker(QRunnable):
+    def __init__(self):
+        super().__init__()
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            self.signals.finished.emit(get_available_fonts(), "")
+        except Exception as e:
+            self.signals.finished.emit(None, str(e))
+
+class FontCatalog(QObject):
+    """Text 对象可用字体的共享目录：在后台线程加载 (磁盘缓存按字体目录指纹失效)，建立搜索索引，所有字体选择框共用同一个列表模型"""
+    loaded = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fonts: List[str] = []
+        self.model = QStringListModel(self)
+        self.is_loaded = False
+        self._folded: List[str] = [] # 与 fonts 同序的小写名称，按此排序以便二分查找前缀
+        self._words: List[Tuple[str, int]] = [] # (名称中的单词, 字体序号)，按单词排序
+        self._worker: Optional[FontCatalogWorker] = None
+
+    def load_async(self) -> None:
+        if self.is_loaded or self._worker is not None: return
+        self._worker = FontCatalogWorker()
+        self._worker.signals.finished.connect(self.on_fonts_loaded)
+        QThreadPool.globalInstance().start(self._worker)
+
+    def on_fonts_loaded(self, fonts: Optional[List[str]], error: str) -> None:
+        self._worker = None
+        if not fonts:
+            # manimpango 不可用时退回 Qt 的字体列表
+            fonts = QFontDatabase.families()
+        self.fonts = sorted(set(fonts), key=str.casefold)
+        self._folded = [name.casefold() for name in self.fonts]
+        self._words = sorted((word, i) for i, name in enumerate(self._folded) for word in re.split(r"[\s\-_]+", name) if word)
+        self.is_loaded = True
+        self.model.setStringList(self.fonts)
+        self.loaded.emit()
+
+    def canonical(self, name: str) -> Optional[str]:
+        # 忽略大小写查找字体，返回目录中的写法
+        key = name.strip().casefold()
+        i = bisect.bisect_left(self._folded, key)
+        return self.fonts[i] if i < len(self._folded) and self._folded[i] == key else None
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        # 依次取: 全名前缀匹配、名称中某个单词的前缀匹配、子串匹配
+        key = query.strip().casefold()
+        if not key: return self.fonts[:limit]
+        hits: List[int] = []
+        seen = set()
+        def add(i: int) -> bool:
+            if i not in seen:
+                seen.add(i)
+                hits.append(i)
+            return len(hits) >= limit
+        i = bisect.bisect_left(self._folded, key)
+        while i < len(self._folded) and self._folded[i].startswith(key):
+            if add(i): return [self.fonts[j] for j in hits]
+            i += 1
+        w = bisect.bisect_left(self._words, (key, -1))
+        word_hits = []
+        while w < len(self._words) and self._words[w][0].startswith(key):
+            word_hits.append(self._words[w][1])
+            w += 1
+        for i in sorted(set(word_hits)):
+            if add(i): return [self.fonts[j] for j in hits]
+        for i, name in enumerate(self._folded):
+            if key in name and add(i): break
+        return [self.fonts[j] for j in hits]
+
+_font_catalog: Optional[FontCatalog] = None
+
+def get_font_catalog() -> FontCatalog:
+    global _font_catalog
+    if _font_catalog is None:
+        _font_catalog = FontCatalog()
+        _font_catalog.load_async()
+    return _font_catalog
+
+class FontPicker(QComboBox):
+    """可输入筛选的字体选择框，下拉列表与筛选结果都来自共享的 FontCatalog；用户选定字体时发出 font_selected"""
+    font_selected = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.catalog = get_font_catalog()
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.setMaxVisibleItems(20)
+        self.setModel(self.catalog.model)
+        self.view().setUniformItemSizes(True)
+        self.current = ""
+
+        self.matches = QStringListModel(self)
+        completer = QCompleter(self.matches, self)
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        completer.activated.connect(self.commit)
+        self.setCompleter(completer)
+        self.lineEdit().textEdited.connect(lambda text: self.matches.setStringList(self.catalog.search(text)))
+        self.lineEdit().editingFinished.connect(lambda: self.commit(self.currentText()))
+        self.activated.connect(lambda index: self.commit(self.itemText(index)))
+        if not self.catalog.is_loaded:
+            self.setPlaceholderText("正在加载字体...")
+            self.catalog.loaded.connect(lambda: self.set_font(self.current))
+
+    def set_font(self, name: str) -> None:
+        # 程序设置当前字体，不发出 font_selected；目录尚未加载或不含该字体时照样显示名称
+        self.current = name
+        index = self.findText(name)
+        if index >= 0: self.setCurrentIndex(index)
+        self.setEditText(name)
+
+    def current_font(self) -> str:
+        return self.current
+
+    def commit(self, text: str) -> None:
+        name = self.catalog.canonical(text)
+        if name is None:
+            self.setEditText(self.current) # 未知字体，恢复原值
+            return
+        changed = name != self.current
+        self.set_font(name)
+        if changed: self.font_selected.emit(name)
+
 # === 组件: 对象属性面板 ===
 class ObjectPropertyPanel(QWidget):
     # 信号定义: (field_name, new_value, save_history)
@@ -385,10 +1378,8 @@ class ObjectPropertyPanel(QWidget):
         
         # 4. 字体
         self.font_label = QLabel("字体:")
-        self.font_combo = QFontComboBox()
-        self.font_combo.clear()
-        self.font_combo.addItems(AVAILABLE_FONTS)
-        self.font_combo.currentFontChanged.connect(self.on_font_changed)
+        self.font_combo = FontPicker()
+        self.font_combo.font_selected.connect(self.on_font_changed)
         
         # 5. 预览区域
         self.preview_area = QScrollArea()
@@ -484,7 +1475,7 @@ class ObjectPropertyPanel(QWidget):
         self.font_label.setVisible(is_text)
         self.font_combo.setVisible(is_text)
         if is_text and mobject.font:
-            self.font_combo.setCurrentFont(QFont(mobject.font))
+            self.font_combo.set_font(mobject.font)
             
         self.preview_area.setVisible(is_math)
         
@@ -538,9 +1529,8 @@ class ObjectPropertyPanel(QWidget):
         if self.current_mobject.mob_type == "MathTex":
             self.trigger_async_preview()
 
-    def on_font_changed(self, font):
+    def on_font_changed(self, val: str):
         if self.is_updating or not self.current_mobject: return
-        val = font.family()
         if val != self.current_mobject.font:
             self.property_changed.emit("font", val, True)
 
@@ -557,15 +1547,21 @@ class ObjectPropertyPanel(QWidget):
         color = self.get_current_color()
         self.preview_label.setText("渲染中...")
         self.preview_label.setStyleSheet(self.base_preview_style + "color: #888;")
+        rgba = MATHTEXT_RASTERIZER.get(latex, get_qt_color(color).name())
+        if rgba is not None:
+            # 命中缓存时直接在主线程显示，不经过线程池
+            get_render_scheduler().cancel("preview")
+            self.on_preview_rendered(rgba_to_image(rgba), None)
+            return
         worker = MatplotlibWorker(latex, color)
-        worker.signals.finished.connect(self.on_preview_rendered)
-        QThreadPool.globalInstance().start(worker)
+        get_render_scheduler().submit("preview", worker, self.on_preview_rendered)
 
-    def on_preview_rendered(self, pixmap, error):
+    def on_preview_rendered(self, image, error):
         if error:
             self.preview_label.setText(str(error).strip())
             self.preview_label.setStyleSheet(self.base_preview_style + "color: #FF5555; padding: 5px; font-size: 9pt;")
-        elif pixmap:
+        elif image is not None and not image.isNull():
+            pixmap = QPixmap.fromImage(image)
             w = self.preview_area.width() - 25
             if pixmap.width() > w:
                 pixmap = pixmap.scaledToWidth(w, Qt.TransformationMode.SmoothTransformation)
@@ -739,10 +1735,8 @@ class MobjectEditDialog(QDialog):
         self.content_edit = QLineEdit("E=mc^2") 
         if mobject: self.content_edit.setText(mobject.content)
         
-        self.font_combo = QFontComboBox()
-        self.font_combo.clear()
-        self.font_combo.addItems(Text.font_list())
-        if mobject and mobject.font: self.font_combo.setCurrentFont(QFont(mobject.font))
+        self.font_combo = FontPicker()
+        self.font_combo.set_font(mobject.font if mobject and mobject.font else QApplication.font().family())
         
         self.content_label = QLabel("内容:")
         self.font_label = QLabel("字体:")
@@ -861,7 +1855,7 @@ class MobjectEditDialog(QDialog):
             "type": self.type_label.text(),
             "color": self.get_current_color_str(),
             "content": self.content_edit.text(),
-            "font": self.font_combo.currentFont().family()
+            "font": self.font_combo.current_font()
         }
   
 class AnimationEditDialog(QDialog):
@@ -913,6 +1907,69 @@ class AnimationEditDialog(QDialog):
             "duration": dur
         }
     
+class BatchRenderDialog(QDialog):
+    """批量渲染设置：选择多个项目文件与多个画质预设，每种组合入队一个渲染任务"""
+
+    def __init__(self, parent: Optional[QWidget] = None, frame_rate: str = "60") -> None:
+        super().__init__(parent)
+        self.setWindowTitle("批量渲染")
+        self.resize(420, 0)
+        layout = QFormLayout(self)
+        layout.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
+
+        self.current_check = QCheckBox("当前场景")
+        self.current_check.setChecked(True)
+        layout.addRow("渲染内容:", self.current_check)
+
+        self.file_list = QListWidget()
+        self.file_list.setMinimumHeight(120)
+        self.file_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        btn_add = QPushButton("添加项目...")
+        btn_add.clicked.connect(self.add_files)
+        btn_remove = QPushButton("移除")
+        btn_remove.clicked.connect(lambda: [self.file_list.takeItem(self.file_list.row(item)) for item in self.file_list.selectedItems()])
+        file_btns = QHBoxLayout()
+        file_btns.addWidget(btn_add)
+        file_btns.addWidget(btn_remove)
+        file_btns.addStretch()
+        file_box = QVBoxLayout()
+        file_box.addWidget(self.file_list)
+        file_box.addLayout(file_btns)
+        layout.addRow("项目文件:", file_box)
+
+        quality_box = QVBoxLayout()
+        self.quality_checks: List[QCheckBox] = []
+        for name in QUALITY_MAP:
+            check = QCheckBox(name)
+            quality_box.addWidget(check)
+            self.quality_checks.append(check)
+        self.quality_checks[2].setChecked(True)
+        layout.addRow("画质:", quality_box)
+
+        self.frame_rate_combo = QComboBox()
+        self.frame_rate_combo.addItems(["15", "30", "60"])
+        self.frame_rate_combo.setCurrentText(frame_rate)
+        layout.addRow("帧率:", self.frame_rate_combo)
+
+        btn_ok = QPushButton("加入队列")
+        btn_ok.setStyleSheet("background-color: #0078d4; color: white; border: none; padding: 6px; font-weight: bold;")
+        btn_ok.clicked.connect(self.accept)
+        layout.addRow(btn_ok)
+
+    def add_files(self) -> None:
+        paths, _ = QFileDialog.getOpenFileNames(self, "添加项目", "", f"{FILE_DESCRIPTION} (*{FILE_EXTENSION})")
+        existing = {self.file_list.item(i).text() for i in range(self.file_list.count())}
+        for path in paths:
+            if path not in existing: self.file_list.addItem(path)
+
+    def get_data(self) -> Dict[str, Any]:
+        return {
+            "include_current": self.current_check.isChecked(),
+            "files": [self.file_list.item(i).text() for i in range(self.file_list.count())],
+            "qualities": [check.text() for check in self.quality_checks if check.isChecked()],
+            "frame_rate": self.frame_rate_combo.currentText()
+        }
+
 class WorkerSignals(QObject):
     # result(object), error(str)
     finished = pyqtSignal(object, str)
@@ -926,11 +1983,15 @@ class MatplotlibWorker(QRunnable):
 
     def run(self):
         try:
-            pixmap, error = render_latex_to_pixmap_mpl(self.latex_text, self.color_str)
+            if not self.latex_text.strip():
+                self.signals.finished.emit(None, None)
+                return
+            # 只在工作线程中构造 QImage，QPixmap 留给主线程
+            rgba, error = get_compile_process_pool().render_mathtext(self.latex_text, self.color_str)
             if error:
                 self.signals.finished.emit(None, error)
             else:
-                self.signals.finished.emit(pixmap, None)
+                self.signals.finished.emit(rgba_to_image(rgba), None)
         except Exception as e:
             import traceback
             self.signals.finished.emit(None, traceback.format_exc())
@@ -944,26 +2005,93 @@ class ManimSvgWorker(QRunnable):
 
     def run(self):
         try:
-            tex_template = TexTemplate()
-            svg_file = tex_to_svg_file(f"${self.latex_text}$", tex_template=tex_template)
-            
-            if not os.path.exists(svg_file):
-                self.signals.finished.emit(None, "LaTeX Compile Failed: File not found")
-                return
+            svg_bytes = get_latex_svg_bytes(self.latex_text, self.color_str)
+            self.signals.finished.emit(svg_bytes, None)
+        except Exception as e:
+            self.signals.finished.emit(None, str(e))
 
-            with open(svg_file, 'r', encoding='utf-8') as f:
-                svg_data = f.read()
-            
-            qt_color = get_qt_color(self.color_str)
-            hex_color = qt_color.name()
-            if "<svg " in svg_data:
-                svg_data = svg_data.replace("<svg ", f'<svg fill="{hex_color}" stroke="none" ')
-            
-            self.signals.finished.emit(svg_data.encode('utf-8'), None)
-            
+class UnitCalibrationWorker(QRunnable):
+    def __init__(self):
+        super().__init__()
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            self.signals.finished.emit(get_compile_process_pool().run(measure_manim_unit_per_pixel), None)
         except Exception as e:
             self.signals.finished.emit(None, str(e))
 
+class LatexBatchWorker(QRunnable):
+    def __init__(self, latex_texts, cancel_event):
+        super().__init__()
+        self.latex_texts = latex_texts
+        self.cancel_event = cancel_event
+        self.signals = WorkerSignals()
+
+    def run(self):
+        if self.cancel_event.is_set():
+            self.signals.finished.emit(self.latex_texts, "cancelled")
+            return
+        try:
+            errors = compile_latex_batch(self.latex_texts)
+            self.signals.finished.emit(errors, None)
+        except Exception as e:
+            self.signals.finished.emit({t: str(e) for t in self.latex_texts}, None)
+
+class RenderScheduler(QObject):
+    """独立的有界渲染线程池：同一 key 的排队请求会被合并，过期（被新请求取代）的结果直接丢弃"""
+
+    def __init__(self, max_workers: int = RENDER_MAX_WORKERS, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.generations: Dict[str, int] = {}
+        self.queued: Dict[str, QRunnable] = {}
+        self.active: set = set()
+
+    def set_max_workers(self, max_workers: int) -> None:
+        self.pool.setMaxThreadCount(max(1, max_workers))
+
+    def submit(self, key: str, worker: QRunnable, callback: Callable[[Any, Optional[str]], None]) -> int:
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        self._take_queued(key)
+        # 由 Python 持有 worker，避免线程池删除后再对其调用 tryTake
+        worker.setAutoDelete(False)
+        worker.signals.finished.connect(lambda result, error: self._on_finished(key, generation, worker, callback, result, error))
+        self.queued[key] = worker
+        self.active.add(worker)
+        self.pool.start(worker)
+        return generation
+
+    def start(self, worker: QRunnable) -> None:
+        self.pool.start(worker)
+
+    def cancel(self, key: str) -> None:
+        if key in self.generations:
+            self.generations[key] += 1
+        self._take_queued(key)
+
+    def _take_queued(self, key: str) -> None:
+        old = self.queued.pop(key, None)
+        if old is not None and self.pool.tryTake(old):
+            self.active.discard(old)
+
+    def _on_finished(self, key: str, generation: int, worker: QRunnable, callback: Callable[[Any, Optional[str]], None], result: Any, error: Optional[str]) -> None:
+        self.active.discard(worker)
+        if self.queued.get(key) is worker:
+            del self.queued[key]
+        if self.generations.get(key) != generation: return
+        callback(result, error)
+
+_render_scheduler: Optional[RenderScheduler] = None
+
+def get_render_scheduler() -> RenderScheduler:
+    global _render_scheduler
+    if _render_scheduler is None:
+        _render_scheduler = RenderScheduler()
+    return _render_scheduler
+
 class ResizeHandle(QGraphicsRectItem):
     def __init__(self, parent: QGraphicsItem, cursor_shape: Qt.CursorShape) -> None:
         super().__init__(-5, -5, 10, 10, parent)
@@ -991,11 +2119,49 @@ class ResizeHandle(QGraphicsRectItem):
         if hasattr(parent, "on_manipulation_end"):
             parent.on_manipulation_end()
 
+class TextLayout:
+    """一段文字在指定字体下的排版结果：字体、以原点为中心的包围盒、预排版的 QStaticText 及其绘制起点"""
+    __slots__ = ("font", "rect", "static_text", "origin")
+
+    def __init__(self, content: str, font_family: str) -> None:
+        self.font = QFont(font_family, BASE_TEXT_SIZE)
+        rect = QFontMetrics(self.font).boundingRect(content)
+        self.rect = QRectF(-rect.width()/2, -rect.height()/2, rect.width(), rect.height())
+        self.static_text = QStaticText(content)
+        self.static_text.setTextFormat(Qt.TextFormat.PlainText)
+        self.static_text.setPerformanceHint(QStaticText.PerformanceHint.AggressiveCaching)
+        self.static_text.prepare(QTransform(), self.font)
+        size = self.static_text.size()
+        # 与 drawText(rect, AlignCenter) 相同：整行文字居中于原点
+        self.origin = QPointF(-size.width()/2, -size.height()/2)
+
+class TextLayoutCache:
+    """按 (内容, 字体) 缓存 TextLayout，同样的文字标签在所有对象间共享，只在主线程使用"""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], TextLayout]" = OrderedDict()
+
+    def get(self, content: str, font_family: str) -> TextLayout:
+        key = (content, font_family)
+        layout = self._entries.get(key)
+        if layout is None:
+            layout = self._entries[key] = TextLayout(content, font_family)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return layout
+
+TEXT_LAYOUT_CACHE = TextLayoutCache()
+
 class VisualMobjectItem(QGraphicsItem):
-    def __init__(self, mobject_data: MobjectData, scene_scale: float, on_move_callback: Optional[Callable[[str], None]] = None, change_callback: Optional[Callable[[str], None]] = None, render_finish_callback: Optional[Callable[[], None]] = None) -> None:
+    def __init__(self, mobject_data: MobjectData, scene_scale: float, on_move_callback: Optional[Callable[[str], None]] = None, change_callback: Optional[Callable[[str], None]] = None, render_finish_callback: Optional[Callable[[], None]] = None, defer_content: bool = False) -> None:
         super().__init__()
         self.mob_data = mobject_data
-        self.scene_scale = Decimal(str(scene_scale)) 
+        # 预先计算的换算系数 (manim 单位/像素)，拖动时不再构造 Decimal
+        self.scene_scale = float(scene_scale)
+        self.inv_scene_scale = 1.0 / self.scene_scale
         self.on_move_callback = on_move_callback
         self.change_callback = change_callback 
         self.render_finish_callback = render_finish_callback 
@@ -1006,30 +2172,43 @@ class VisualMobjectItem(QGraphicsItem):
                       QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
         
         self.svg_renderer: Optional[QSvgRenderer] = None
+        self.text_layout: Optional[TextLayout] = None # 仅 Text 对象，内容或字体变化时在 update_content 中更换
         self.last_content_signature: Optional[Tuple[str, str, str, str]] = None 
         self.has_render_error = False
         self.render_error_msg = ""
         self.last_valid_bounding_rect: Optional[QRectF] = None
+        # 延迟加载: 未缓存的公式先用占位几何插入，由画布的加载任务稍后填充
+        self.is_pending_content = False
+        self.snap_index: Optional[SnapIndex] = None
+        self.handles: List[ResizeHandle] = []
+        self.is_resizing = False
+        self.is_manipulating = False
+        self.position_commit_pending = False
         
-        self.update_content(sync=True)
+        if defer_content and self.mob_data.mob_type == "MathTex" and self.mob_data.content.strip() and not is_latex_cached(self.mob_data.content):
+            self.is_pending_content = True
+            self._bounding_rect = self._calculate_bounding_rect()
+            self.notify_geometry_changed()
+        else:
+            self.update_content(sync=True)
         
         self.setScale(self.mob_data.scale)
         self.update_position_from_data()
         self.update_tooltip()
-        self.handles: List[ResizeHandle] = []
-        self.is_resizing = False
-        self.is_manipulating = False
 
     def update_content(self, sync: bool = False) -> None:
         sig = (self.mob_data.content, self.mob_data.color, self.mob_data.font, self.mob_data.mob_type)
         if sig == self.last_content_signature: return
         self.last_content_signature = sig
+        self.is_pending_content = False
         
         if self.mob_data.mob_type != "MathTex":
             self.prepareGeometryChange()
             self.svg_renderer = None
             self.has_render_error = False
+            self.text_layout = TEXT_LAYOUT_CACHE.get(self.mob_data.content, self.mob_data.font) if self.mob_data.mob_type == "Text" else None
             self._bounding_rect = self._calculate_bounding_rect()
+            self.notify_geometry_changed()
             if self.isSelected(): self.create_handles()
             self.update()
             return
@@ -1044,12 +2223,22 @@ class VisualMobjectItem(QGraphicsItem):
                 self.has_render_error = False
                 self.svg_renderer = renderer
             self._bounding_rect = self._calculate_bounding_rect()
+            self.notify_geometry_changed()
             if self.isSelected(): self.create_handles()
             self.update()
         else:
             worker = ManimSvgWorker(self.mob_data.content, self.mob_data.color)
-            worker.signals.finished.connect(self.on_svg_rendered)
-            QThreadPool.globalInstance().start(worker)
+            get_render_scheduler().submit(f"svg:{self.mob_data.id}", worker, self.on_svg_rendered)
+
+    def finish_deferred_content(self, error: Optional[str]) -> None:
+        if not self.is_pending_content: return
+        if error:
+            # 编译失败的公式不再在主线程重试，直接标记错误
+            self.last_content_signature = (self.mob_data.content, self.mob_data.color, self.mob_data.font, self.mob_data.mob_type)
+            self.is_pending_content = False
+            self.on_svg_rendered(None, error)
+        else:
+            self.update_content(sync=True)
 
     def on_svg_rendered(self, svg_bytes, error):
         self.prepareGeometryChange()
@@ -1063,6 +2252,7 @@ class VisualMobjectItem(QGraphicsItem):
             self.svg_renderer = QSvgRenderer(QByteArray(svg_bytes))
         
         self._bounding_rect = self._calculate_bounding_rect()
+        self.notify_geometry_changed()
         
         if self.isSelected():
             self.create_handles()
@@ -1073,25 +2263,25 @@ class VisualMobjectItem(QGraphicsItem):
             self.render_finish_callback()
 
     def _calculate_bounding_rect(self) -> QRectF:
-        factor = Decimal("1.0") / self.scene_scale
+        factor = self.inv_scene_scale
         new_rect = None
         
         if self.mob_data.mob_type == "Square":
-            s = Decimal("2.0") * factor
+            s = 2.0 * factor
             new_rect = QRectF(-s/2, -s/2, s, s)
         elif self.mob_data.mob_type == "Circle":
-            d = Decimal("2.0") * factor 
+            d = 2.0 * factor 
             new_rect = QRectF(-d/2, -d/2, d, d)
         elif self.mob_data.mob_type == "Text":
-            font = QFont(self.mob_data.font, BASE_TEXT_SIZE)
-            fm = QFontMetrics(font)
-            rect = fm.boundingRect(self.mob_data.content)
-            new_rect = QRectF(-rect.width()/2, -rect.height()/2, rect.width(), rect.height())
+            if self.text_layout is None:
+                self.text_layout = TEXT_LAYOUT_CACHE.get(self.mob_data.content, self.mob_data.font)
+            new_rect = QRectF(self.text_layout.rect)
         elif self.mob_data.mob_type == "MathTex":
             if self.svg_renderer and self.svg_renderer.isValid():
                 vbox = self.svg_renderer.viewBoxF()
-                width_in_units = Decimal(str(vbox.width())) * MANIM_UNIT_PER_PIXEL
-                height_in_units = Decimal(str(vbox.height())) * MANIM_UNIT_PER_PIXEL
+                unit_per_pixel = get_manim_unit_per_pixel()
+                width_in_units = vbox.width() * unit_per_pixel
+                height_in_units = vbox.height() * unit_per_pixel
                 display_w = width_in_units * factor
                 display_h = height_in_units * factor
                 new_rect = QRectF(-display_w/2, -display_h/2, display_w, display_h)
@@ -1115,6 +2305,20 @@ class VisualMobjectItem(QGraphicsItem):
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget]) -> None:
         color = get_qt_color(self.mob_data.color)
         
+        if self.is_pending_content:
+            pending_pen = QPen(QColor("#888888"), 1, Qt.PenStyle.DashLine)
+            pending_pen.setCosmetic(True)
+            painter.setPen(pending_pen)
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRect(self._bounding_rect)
+            painter.drawText(self._bounding_rect, Qt.AlignmentFlag.AlignCenter, "加载中...")
+            if self.isSelected():
+                sel_pen = QPen(Qt.GlobalColor.white, 1, Qt.PenStyle.SolidLine)
+                sel_pen.setCosmetic(True)
+                painter.setPen(sel_pen)
+                painter.drawRect(self.boundingRect())
+            return
+
         if self.has_render_error and self.mob_data.mob_type == "MathTex":
             painter.setPen(QPen(Qt.GlobalColor.red, 2, Qt.PenStyle.DashLine))
             painter.drawRect(self._bounding_rect)
@@ -1157,11 +2361,10 @@ class VisualMobjectItem(QGraphicsItem):
             painter.setBrush(QBrush(c))
             painter.drawEllipse(rect)
             
-        elif self.mob_data.mob_type == "Text":
+        elif self.mob_data.mob_type == "Text" and self.text_layout is not None:
             painter.setPen(QPen(color))
-            font = QFont(self.mob_data.font, BASE_TEXT_SIZE)
-            painter.setFont(font)
-            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextDontClip, self.mob_data.content)
+            painter.setFont(self.text_layout.font)
+            painter.drawStaticText(self.text_layout.origin, self.text_layout.static_text)
             
         elif self.mob_data.mob_type == "MathTex":
             if self.svg_renderer and self.svg_renderer.isValid():
@@ -1175,32 +2378,57 @@ class VisualMobjectItem(QGraphicsItem):
             painter.drawRect(self.boundingRect())
 
     def update_position_from_data(self) -> None:
-        self.setPos(Decimal(str(self.mob_data.x)) / self.scene_scale, -Decimal(str(self.mob_data.y)) / self.scene_scale)
+        self.setPos(self.mob_data.x * self.inv_scene_scale, -self.mob_data.y * self.inv_scene_scale)
         
     def update_tooltip(self) -> None:
         self.setToolTip(f"{self.mob_data.name}\nPos: ({self.mob_data.x:.2f}, {self.mob_data.y:.2f})\nScale: {self.mob_data.scale:.2f}")
         
     def itemChange(self, change: QGraphicsItem.GraphicsItemChange, value: Any) -> Any:
         if change == QGraphicsItem.GraphicsItemChange.ItemPositionChange and not self.is_resizing:
-            views = self.scene().views()
-            if views and isinstance(views[0], ManimCanvas) and self.scene().mouseGrabberItem() == self:
-                canvas = views[0]
-                new_pos = canvas.get_snapped_position(self, value)
-                self.mob_data.x = round(Decimal(str(new_pos.x())) * self.scene_scale, 2)
-                self.mob_data.y = round(-Decimal(str(new_pos.y())) * self.scene_scale, 2)
-                self.update_tooltip()
-                if self.on_move_callback: self.on_move_callback(self.mob_data.id)
-                return new_pos
-            new_pos = value
-            self.mob_data.x = round(Decimal(str(new_pos.x())) * self.scene_scale, 2)
-            self.mob_data.y = round(-Decimal(str(new_pos.y())) * self.scene_scale, 2)
-            self.update_tooltip()
-            if self.on_move_callback: self.on_move_callback(self.mob_data.id)
+            scene = self.scene()
+            grabber = scene.mouseGrabberItem() if scene is not None else None
+            if grabber == self:
+                # 拖动中只移动图形，数据、提示和回调每帧最多提交一次，松开时再提交一次
+                views = scene.views()
+                if views and isinstance(views[0], ManimCanvas):
+                    value = views[0].get_snapped_position(self, value)
+                self.schedule_position_commit()
+                return value
+            if grabber is not None and self.isSelected():
+                # 多选拖动时跟随移动的其他对象
+                self.schedule_position_commit()
+            else:
+                self.commit_position(value)
         elif change == QGraphicsItem.GraphicsItemChange.ItemSelectedChange:
             if value: self.create_handles()
             else: self.remove_handles()
+        elif change in (QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged,
+                        QGraphicsItem.GraphicsItemChange.ItemScaleHasChanged,
+                        QGraphicsItem.GraphicsItemChange.ItemVisibleHasChanged):
+            # 拖动中的对象不参与吸附查询，松开时再统一更新索引
+            if not self.is_manipulating: self.notify_geometry_changed()
         return super().itemChange(change, value)
 
+    def commit_position(self, pos: QPointF) -> None:
+        self.mob_data.x = round(pos.x() * self.scene_scale, 2)
+        self.mob_data.y = round(-pos.y() * self.scene_scale, 2)
+        self.update_tooltip()
+        if self.on_move_callback: self.on_move_callback(self.mob_data.id)
+
+    def schedule_position_commit(self) -> None:
+        if self.position_commit_pending: return
+        self.position_commit_pending = True
+        QTimer.singleShot(16, self.flush_position_commit)
+
+    def flush_position_commit(self) -> None:
+        if not self.position_commit_pending: return
+        self.position_commit_pending = False
+        self.commit_position(self.pos())
+
+    def notify_geometry_changed(self) -> None:
+        if self.snap_index is not None:
+            self.snap_index.update_item(self)
+
     def create_handles(self) -> None:
         self.remove_handles()
         b = self.boundingRect() 
@@ -1230,6 +2458,8 @@ class VisualMobjectItem(QGraphicsItem):
     def on_manipulation_end(self) -> None:
         if self.is_manipulating:
             self.is_manipulating = False
+            self.flush_position_commit()
+            self.notify_geometry_changed()
             if self.change_callback: self.change_callback("end")
 
     def mousePressEvent(self, event: QGraphicsSceneMouseEvent) -> None:
@@ -1262,9 +2492,82 @@ class VisualMobjectItem(QGraphicsItem):
         for h in self.handles: h.setScale(inv_scale)
         self.is_resizing = False
 
+class SnapIndex:
+    """吸附候选的增量索引：按坐标排序保存所有可见对象的 左/中/右 与 上/中/下 边，查询时二分查找"""
+
+    def __init__(self) -> None:
+        self.x_edges: List[Tuple[float, str]] = []
+        self.y_edges: List[Tuple[float, str]] = []
+        self.rects: Dict[str, QRectF] = {}
+
+    @staticmethod
+    def _edges(rect: QRectF) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+        return (rect.left(), rect.center().x(), rect.right()), (rect.top(), rect.center().y(), rect.bottom())
+
+    def set_rect(self, owner: str, rect: Optional[QRectF]) -> None:
+        old = self.rects.pop(owner, None)
+        if old is not None:
+            old_xs, old_ys = self._edges(old)
+            for v in old_xs: self._remove(self.x_edges, (v, owner))
+            for v in old_ys: self._remove(self.y_edges, (v, owner))
+        if rect is None: return
+        self.rects[owner] = rect
+        xs, ys = self._edges(rect)
+        for v in xs: bisect.insort(self.x_edges, (v, owner))
+        for v in ys: bisect.insort(self.y_edges, (v, owner))
+
+    @staticmethod
+    def _remove(edges: List[Tuple[float, str]], entry: Tuple[float, str]) -> None:
+        i = bisect.bisect_left(edges, entry)
+        if i < len(edges) and edges[i] == entry:
+            del edges[i]
+
+    def update_item(self, item: "VisualMobjectItem") -> None:
+        if item.scene() is None or not item.isVisible():
+            self.set_rect(item.mob_data.id, None)
+        else:
+            self.set_rect(item.mob_data.id, item.mapRectToScene(item._bounding_rect))
+
+    def remove_item(self, mob_id: str) -> None:
+        self.set_rect(mob_id, None)
+
+    @staticmethod
+    def _nearest(edges: List[Tuple[float, str]], value: float, limit: float, exclude: str) -> Tuple[float, Optional[Tuple[float, str]]]:
+        # 从插入点向两侧展开，只需越过被排除对象自身的边
+        best_dist = limit
+        best = None
+        i = bisect.bisect_left(edges, (value,))
+        j = i
+        while j < len(edges) and edges[j][0] - value < best_dist:
+            if edges[j][1] != exclude:
+                best_dist, best = edges[j][0] - value, edges[j]
+                break
+            j += 1
+        k = i - 1
+        while k >= 0 and value - edges[k][0] < best_dist:
+            if edges[k][1] != exclude:
+                best_dist, best = value - edges[k][0], edges[k]
+                break
+            k -= 1
+        return best_dist, best
+
+    def query(self, axis: str, candidates: List[float], limit: float, exclude: str) -> Optional[Tuple[float, float, QRectF]]:
+        # 返回 (自身候选值, 吸附目标值, 目标矩形)
+        edges = self.x_edges if axis == "x" else self.y_edges
+        best_dist = limit
+        result = None
+        for my_val in candidates:
+            dist, entry = self._nearest(edges, my_val, best_dist, exclude)
+            if entry is not None and dist < best_dist:
+                best_dist = dist
+                result = (my_val, entry[0], self.rects[entry[1]])
+        return result
+
 class ManimCanvas(QGraphicsView):
     scale_changed = pyqtSignal(int) 
     item_render_changed = pyqtSignal() 
+    load_progress = pyqtSignal(int, int) # (已完成, 总数)
+    load_finished = pyqtSignal(bool) # 是否被取消
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
@@ -1287,28 +2590,43 @@ class ManimCanvas(QGraphicsView):
         self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
         self.items_map: Dict[str, VisualMobjectItem] = {}
+        add_unit_calibration_listener(self.refresh_math_geometry)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.current_zoom_percent = 100
 
-        self.guide_lines: List[QGraphicsLineItem] = [] 
+        # 参考线不进入场景图，只在 drawForeground 中绘制，拖动时不会修改场景
+        self.guide_lines: List[QLineF] = [] 
+        self.guide_pen = QPen(QColor("#FF8800"), 1, Qt.PenStyle.DashLine)
         self.snap_threshold = SNAP_THRESHOLD_PIXELS
+        self.snap_index = SnapIndex()
+        self.snap_index.set_rect("", self.black_board.mapRectToScene(self.black_board.rect()))
+
+        self.load_cancel_event: Optional[threading.Event] = None
+        self.load_total = 0
+        self.load_done = 0
+        self.load_chunks_left = 0
 
     def clear_guides(self) -> None:
-        for line in self.guide_lines:
-            self.scene.removeItem(line)
-        self.guide_lines.clear()
-
-    def draw_guide_line(self, x1: float, y1: float, x2: float, y2: float) -> None:
-        line = QGraphicsLineItem(x1, y1, x2, y2)
-        pen = QPen(QColor("#FF8800"), 1, Qt.PenStyle.DashLine) 
-        line.setPen(pen)
-        line.setZValue(1000)
-        self.scene.addItem(line)
-        self.guide_lines.append(line)
+        self.set_guides([])
+
+    def set_guides(self, lines: List[QLineF]) -> None:
+        if not lines and not self.guide_lines: return
+        old_lines = self.guide_lines
+        self.guide_lines = lines
+        # 只重绘新旧参考线覆盖的区域
+        for line in old_lines + lines:
+            rect = QRectF(line.p1(), line.p2()).normalized().adjusted(-2, -2, 2, 2)
+            self.viewport().update(self.mapFromScene(rect).boundingRect().adjusted(-2, -2, 2, 2))
+
+    def drawForeground(self, painter: QPainter, rect: QRectF) -> None:
+        super().drawForeground(painter, rect)
+        if not self.guide_lines: return
+        painter.setPen(self.guide_pen)
+        painter.drawLines(self.guide_lines)
 
     def get_snapped_position(self, moving_item: VisualMobjectItem, proposed_pos: QPointF) -> QPointF:
-        self.clear_guides()
+        guides: List[QLineF] = []
         
         local_rect = moving_item._bounding_rect
         scale = moving_item.scale()
@@ -1321,69 +2639,28 @@ class ManimCanvas(QGraphicsView):
         my_top = cy + local_rect.top() * scale
         my_bottom = cy + local_rect.bottom() * scale
         
-        x_candidates = [my_left, cx, my_right]
-        y_candidates = [my_top, cy, my_bottom]
-
-        targets = []
-        targets.append(self.black_board.mapRectToScene(self.black_board.rect()))
-        
-        for other_id, other_item in self.items_map.items():
-            if other_item == moving_item: continue
-            if not other_item.isVisible(): continue
-            real_rect = other_item.mapRectToScene(other_item._bounding_rect)
-            targets.append(real_rect)
-
+        exclude = moving_item.mob_data.id
         final_dx = 0.0
         final_dy = 0.0
-        min_dist_x = self.snap_threshold
-        min_dist_y = self.snap_threshold
-        
-        snap_x_draw_params = None 
-        snap_y_draw_params = None
-
-        target: QRectF
-        for target in targets:
-            t_pts = [target.left(), target.center().x(), target.right()]
-            
-            for my_val in x_candidates:
-                for target_val in t_pts:
-                    dist = abs(my_val - target_val)
-                    if dist < min_dist_x:
-                        min_dist_x = dist
-                        final_dx = target_val - my_val
-                        
-                        union_top = min(my_top, target.top())
-                        union_bottom = max(my_bottom, target.bottom())
-                        snap_x_draw_params = (target_val, union_top, union_bottom)
-
-        for target in targets:
-            t_pts = [target.top(), target.center().y(), target.bottom()]
-            
-            for my_val in y_candidates:
-                for target_val in t_pts:
-                    dist = abs(my_val - target_val)
-                    if dist < min_dist_y:
-                        min_dist_y = dist
-                        final_dy = target_val - my_val
-                        
-                        pred_left = my_left + final_dx
-                        pred_right = my_right + final_dx
-                        union_left = min(pred_left, target.left())
-                        union_right = max(pred_right, target.right())
-                        snap_y_draw_params = (target_val, union_left, union_right)
-
-        new_x = cx + final_dx
-        new_y = cy + final_dy
-
-        if snap_x_draw_params:
-            x, y1, y2 = snap_x_draw_params
-            self.draw_guide_line(x, y1 - 20, x, y2 + 20)
-            
-        if snap_y_draw_params:
-            y, x1, x2 = snap_y_draw_params
-            self.draw_guide_line(x1 - 20, y, x2 + 20, y)
 
-        return QPointF(new_x, new_y)
+        snap_x = self.snap_index.query("x", [my_left, cx, my_right], self.snap_threshold, exclude)
+        if snap_x:
+            my_val, target_val, target = snap_x
+            final_dx = target_val - my_val
+            union_top = min(my_top, target.top())
+            union_bottom = max(my_bottom, target.bottom())
+            guides.append(QLineF(target_val, union_top - 20, target_val, union_bottom + 20))
+
+        snap_y = self.snap_index.query("y", [my_top, cy, my_bottom], self.snap_threshold, exclude)
+        if snap_y:
+            my_val, target_val, target = snap_y
+            final_dy = target_val - my_val
+            union_left = min(my_left + final_dx, target.left())
+            union_right = max(my_right + final_dx, target.right())
+            guides.append(QLineF(union_left - 20, target_val, union_right + 20, target_val))
+
+        self.set_guides(guides)
+        return QPointF(cx + final_dx, cy + final_dy)
 
     def wheelEvent(self, event: QWheelEvent) -> None:
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
@@ -1439,32 +2716,561 @@ class ManimCanvas(QGraphicsView):
             self.setDragMode(QGraphicsView.DragMode.NoDrag)
         super().mouseReleaseEvent(event)
 
-    def add_visual_item(self, mobject: MobjectData, on_move_cb: Callable[[str], None], change_cb: Optional[Callable[[str], None]] = None) -> None:
+    def add_visual_item(self, mobject: MobjectData, on_move_cb: Callable[[str], None], change_cb: Optional[Callable[[str], None]] = None, defer_content: bool = False) -> None:
         if mobject.id in self.items_map: self.remove_visual_item(mobject.id)
         
         render_cb = lambda: self.item_render_changed.emit()
         
-        item = VisualMobjectItem(mobject, self.pixels_to_units, on_move_cb, change_cb, render_finish_callback=render_cb)
+        item = VisualMobjectItem(mobject, self.pixels_to_units, on_move_cb, change_cb, render_finish_callback=render_cb, defer_content=defer_content)
         self.scene.addItem(item)
         self.items_map[mobject.id] = item
+        item.snap_index = self.snap_index
+        item.notify_geometry_changed()
         
         self.item_render_changed.emit()
 
-    def update_item_content(self, mob_id: str) -> None:
-        if mob_id in self.items_map:
-            item = self.items_map[mob_id]
-            item.update_content()
+    def start_deferred_load(self) -> None:
+        # 把所有占位项的公式分块交给线程池批量编译，每块完成后立即刷新对应画布项
+        pending = list(dict.fromkeys(item.mob_data.content for item in self.items_map.values() if item.is_pending_content))
+        if not pending: return
+        if self.load_cancel_event is not None:
+            self.load_cancel_event.set()
+        self.load_cancel_event = threading.Event()
+        self.load_total = len(pending)
+        self.load_done = 0
+        scheduler = get_render_scheduler()
+        chunk_size = max(1, min(24, -(-len(pending) // max(1, scheduler.pool.maxThreadCount()))))
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        self.load_chunks_left = len(chunks)
+        self.load_progress.emit(0, self.load_total)
+        cancel_event = self.load_cancel_event
+        for chunk in chunks:
+            worker = LatexBatchWorker(chunk, cancel_event)
+            worker.signals.finished.connect(lambda result, error, ev=cancel_event: self.on_load_chunk_finished(ev, result, error))
+            scheduler.start(worker)
+
+    def cancel_deferred_load(self) -> None:
+        if self.load_cancel_event is not None:
+            self.load_cancel_event.set()
+
+    def on_load_chunk_finished(self, cancel_event: threading.Event, result: Any, error: Optional[str]) -> None:
+        if cancel_event is not self.load_cancel_event: return
+        if not error:
+            by_content: Dict[str, List[VisualMobjectItem]] = {}
+            for item in self.items_map.values():
+                if item.is_pending_content:
+                    by_content.setdefault(item.mob_data.content, []).append(item)
+            for latex_text, compile_error in result.items():
+                for item in by_content.get(latex_text, []):
+                    item.finish_deferred_content(compile_error)
+            self.load_done += len(result)
+            self.load_progress.emit(self.load_done, self.load_total)
+            self.item_render_changed.emit()
+        self.load_chunks_left -= 1
+        if self.load_chunks_left <= 0:
+            cancelled = cancel_event.is_set()
+            self.load_cancel_event = None
+            self.load_finished.emit(cancelled)
+
+    def sync_item_from_data(self, mob_id: str) -> None:
+        # 数据模型中的对象被原地修改后，把缩放/可见性/位置/内容同步到画布图元
+        item = self.items_map.get(mob_id)
+        if item is None: return
+        mob = item.mob_data
+        if item.scale() != mob.scale: item.setScale(mob.scale)
+        if item.isVisible() != mob.visible: item.setVisible(mob.visible)
+        item.update_position_from_data()
+        item.update_tooltip()
+        item.update_content()
+        item.update()
+
+    def refresh_math_geometry(self) -> None:
+        # 单位校准完成后按新的换算系数重算公式对象的包围盒
+        for item in self.items_map.values():
+            if item.mob_data.mob_type != "MathTex" or item.svg_renderer is None: continue
+            item.prepareGeometryChange()
+            item._bounding_rect = item._calculate_bounding_rect()
+            item.notify_geometry_changed()
+            if item.isSelected(): item.create_handles()
             item.update()
 
     def remove_visual_item(self, mob_id: str) -> None:
+        get_render_scheduler().cancel(f"svg:{mob_id}")
         if mob_id in self.items_map:
+            self.items_map[mob_id].snap_index = None
+            self.snap_index.remove_item(mob_id)
             self.scene.removeItem(self.items_map[mob_id])
             del self.items_map[mob_id]
             self.item_render_changed.emit()
             
-    def set_item_visible(self, mob_id: str, visible: bool) -> None:
-        if mob_id in self.items_map:
-            self.items_map[mob_id].setVisible(visible)
+# === 组件: 对象/动画列表模型与委托 ===
+class IdListModel(QAbstractListModel):
+    """按顺序持有带 id 的数据对象，维护 id→行号 索引，通过细粒度的增删改信号通知视图"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items: List[Any] = []
+        self._rows: Optional[Dict[str, int]] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._items): return None
+        obj = self._items[index.row()]
+        if role == Qt.ItemDataRole.UserRole: return obj.id
+        if role == Qt.ItemDataRole.DisplayRole: return self.display_text(obj)
+        return None
+
+    def display_text(self, obj: Any) -> str:
+        return obj.id
+
+    def row_of(self, obj_id: str) -> int:
+        if self._rows is None:
+            self._rows = {obj.id: row for row, obj in enumerate(self._items)}
+        return self._rows.get(obj_id, -1)
+
+    def object_at(self, row: int) -> Any:
+        return self._items[row]
+
+    def index_of(self, obj_id: str) -> QModelIndex:
+        row = self.row_of(obj_id)
+        return self.index(row) if row >= 0 else QModelIndex()
+
+    def set_objects(self, objects: List[Any]) -> None:
+        self.beginResetModel()
+        self._items = list(objects)
+        self._rows = None
+        self.endResetModel()
+
+    def append_object(self, obj: Any) -> None:
+        row = len(self._items)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.append(obj)
+        if self._rows is not None: self._rows[obj.id] = row
+        self.endInsertRows()
+
+    def remove_id(self, obj_id: str) -> None:
+        row = self.row_of(obj_id)
+        if row < 0: return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._items[row]
+        self._rows = None
+        self.endRemoveRows()
+
+    def update_id(self, obj_id: str) -> None:
+        row = self.row_of(obj_id)
+        if row >= 0:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx)
+
+    def refresh_all(self) -> None:
+        if self._items:
+            self.dataChanged.emit(self.index(0), self.index(len(self._items) - 1))
+
+    def sync(self, objects: List[Any], dirty_ids: set) -> None:
+        # 与新的对象序列对齐：只删除/插入/通知发生变化的行；相对顺序改变时退化为整体重置
+        ids = [obj.id for obj in objects]
+        id_set = set(ids)
+        for row in range(len(self._items) - 1, -1, -1):
+            if self._items[row].id not in id_set:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._items[row]
+                self.endRemoveRows()
+        self._rows = None
+        existing = [obj.id for obj in self._items]
+        existing_set = set(existing)
+        if existing != [i for i in ids if i in existing_set]:
+            self.set_objects(objects)
+            return
+        for row, obj in enumerate(objects):
+            if row >= len(self._items) or self._items[row].id != obj.id:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._items.insert(row, obj)
+                self.endInsertRows()
+            elif self._items[row] is not obj or obj.id in dirty_ids:
+                self._items[row] = obj
+                idx = self.index(row)
+                self.dataChanged.emit(idx, idx)
+        self._rows = None
+
+class MobjectListModel(IdListModel):
+    TYPE_ROLE = Qt.ItemDataRole.UserRole + 1
+    VISIBLE_ROLE = Qt.ItemDataRole.UserRole + 2
+
+    def display_text(self, obj: MobjectData) -> str:
+        return obj.name
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if index.isValid() and index.row() < len(self._items):
+            if role == self.TYPE_ROLE: return self._items[index.row()].mob_type
+            if role == self.VISIBLE_ROLE: return self._items[index.row()].visible
+        return super().data(index, role)
+
+class AnimationListModel(IdListModel):
+    VALID_ROLE = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, describe: Callable[[AnimationData], Tuple[str, bool]], parent=None):
+        super().__init__(parent)
+        # 描述文本在绘制时按需生成，只有可见行会被计算
+        self.describe = describe
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if index.isValid() and index.row() < len(self._items):
+            if role == Qt.ItemDataRole.DisplayRole:
+                return f"{index.row() + 1}. {self.describe(self._items[index.row()])[0]}"
+            if role == self.VALID_ROLE: return self.describe(self._items[index.row()])[1]
+        return super().data(index, role)
+
+class ListRowDelegate(QStyledItemDelegate):
+    """列表行委托：直接绘制文本与图标按钮，不再为每一行创建 QWidget"""
+    delete_clicked = pyqtSignal(str)
+    ROW_HEIGHT = 36
+    BUTTON_SIZE = 24
+    DELETE_TOOLTIP = "删除"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.icon_delete = qta.icon('fa5s.trash-alt', color='#d13438')
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(0, self.ROW_HEIGHT)
+
+    def delete_rect(self, rect: QRect) -> QRect:
+        return QRect(rect.right() - 5 - self.BUTTON_SIZE, rect.center().y() - self.BUTTON_SIZE // 2, self.BUTTON_SIZE, self.BUTTON_SIZE)
+
+    def paint_background(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+
+    def paint_button(self, painter: QPainter, icon: QIcon, rect: QRect) -> None:
+        icon.paint(painter, rect.adjusted(4, 4, -4, -4))
+
+    def button_at(self, rect: QRect, pos: QPoint) -> Optional[str]:
+        if self.delete_rect(rect).contains(pos): return "delete"
+        return None
+
+    def editorEvent(self, event: QEvent, model: QAbstractItemModel, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease, QEvent.Type.MouseButtonDblClick):
+            button = self.button_at(option.rect, event.position().toPoint())
+            if button is None: return super().editorEvent(event, model, option, index)
+            if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+                self.on_button_clicked(button, index.data(Qt.ItemDataRole.UserRole))
+            # 点击按钮区域不改变选择
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def on_button_clicked(self, button: str, obj_id: str) -> None:
+        if button == "delete": self.delete_clicked.emit(obj_id)
+
+    def helpEvent(self, event, view, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() == QEvent.Type.ToolTip and self.delete_rect(option.rect).contains(event.pos()):
+            QToolTip.showText(event.globalPos(), self.DELETE_TOOLTIP, view)
+            return True
+        return super().helpEvent(event, view, option, index)
+
+class MobjectItemDelegate(ListRowDelegate):
+    visibility_clicked = pyqtSignal(str)
+    ROW_HEIGHT = 42
+    DELETE_TOOLTIP = "删除对象"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.icon_visible = qta.icon('fa5s.eye', color='#555')
+        self.icon_hidden = qta.icon('fa5s.eye-slash', color='#555')
+
+    def visibility_rect(self, rect: QRect) -> QRect:
+        return QRect(rect.left() + 5, rect.center().y() - self.BUTTON_SIZE // 2, self.BUTTON_SIZE, self.BUTTON_SIZE)
+
+    def button_at(self, rect: QRect, pos: QPoint) -> Optional[str]:
+        if self.visibility_rect(rect).contains(pos): return "visibility"
+        return super().button_at(rect, pos)
+
+    def on_button_clicked(self, button: str, obj_id: str) -> None:
+        if button == "visibility": self.visibility_clicked.emit(obj_id)
+        else: super().on_button_clicked(button, obj_id)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        self.paint_background(painter, option, index)
+        rect = option.rect
+        vis_rect = self.visibility_rect(rect)
+        del_rect = self.delete_rect(rect)
+        self.paint_button(painter, self.icon_visible if index.data(MobjectListModel.VISIBLE_ROLE) else self.icon_hidden, vis_rect)
+        self.paint_button(painter, self.icon_delete, del_rect)
+
+        painter.save()
+        type_font = QFont(option.font)
+        type_font.setPointSize(9)
+        type_text = index.data(MobjectListModel.TYPE_ROLE) or ""
+        type_width = QFontMetrics(type_font).horizontalAdvance(type_text)
+        type_rect = QRect(del_rect.left() - 10 - type_width, rect.top(), type_width, rect.height())
+        painter.setFont(type_font)
+        painter.setPen(QColor("#888"))
+        painter.drawText(type_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, type_text)
+
+        name_font = QFont(option.font)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        painter.setPen(QColor("#333333"))
+        name_rect = QRect(vis_rect.right() + 8, rect.top(), max(0, type_rect.left() - vis_rect.right() - 16), rect.height())
+        name = QFontMetrics(name_font).elidedText(index.data(Qt.ItemDataRole.DisplayRole) or "", Qt.TextElideMode.ElideRight, name_rect.width())
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, name)
+        painter.restore()
+
+class AnimationItemDelegate(ListRowDelegate):
+    DELETE_TOOLTIP = "删除动画"
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        self.paint_background(painter, option, index)
+        rect = option.rect
+        del_rect = self.delete_rect(rect)
+        self.paint_button(painter, self.icon_delete, del_rect)
+
+        painter.save()
+        painter.setFont(option.font)
+        painter.setPen(QColor("#333333") if index.data(AnimationListModel.VALID_ROLE) else QColor("red"))
+        text_rect = QRect(rect.left() + 10, rect.top(), max(0, del_rect.left() - rect.left() - 18), rect.height())
+        text = QFontMetrics(option.font).elidedText(index.data(Qt.ItemDataRole.DisplayRole) or "", Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
+
+# === 组件: 渲染队列面板 ===
+class RenderQueuePanel(QWidget):
+    """渲染队列列表：每行一个任务，显示状态与进度说明，下方显示选中任务的输出日志"""
+
+    def __init__(self, queue: RenderQueue, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.rows: Dict[int, int] = {} # job.id -> 行号
+        self.jobs: List[RenderJob] = []
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["任务", "状态", "说明"])
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.doubleClicked.connect(lambda _: self.open_output())
+
+        btn_layout = QHBoxLayout()
+        self.btn_cancel = QPushButton("取消任务")
+        self.btn_cancel.setIcon(qta.icon('fa5s.stop', color='#d13438'))
+        self.btn_cancel.clicked.connect(self.cancel_selected)
+        self.btn_open = QPushButton("打开输出")
+        self.btn_open.setIcon(qta.icon('fa5s.folder-open', color='#555'))
+        self.btn_open.clicked.connect(self.open_output)
+        btn_clear = QPushButton("清除已结束")
+        btn_clear.clicked.connect(self.clear_finished)
+        btn_layout.addWidget(self.btn_cancel)
+        btn_layout.addWidget(self.btn_open)
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_clear)
+
+        self.log_view = QTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setPlaceholderText("选择任务以查看输出...")
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        table_container = QWidget()
+        table_layout = QVBoxLayout(table_container)
+        table_layout.setContentsMargins(0, 0, 0, 0)
+        table_layout.addWidget(self.table)
+        table_layout.addLayout(btn_layout)
+        splitter.addWidget(table_container)
+        splitter.addWidget(self.log_view)
+        splitter.setSizes([450, 550])
+        layout.addWidget(splitter)
+
+        queue.job_changed.connect(self.on_job_changed)
+        queue.job_output.connect(self.on_job_output)
+        self.update_buttons()
+
+    def selected_job(self) -> Optional[RenderJob]:
+        row = self.table.currentRow()
+        return self.jobs[row] if 0 <= row < len(self.jobs) and self.table.selectedItems() else None
+
+    def on_job_changed(self, job: RenderJob) -> None:
+        row = self.rows.get(job.id)
+        if row is None:
+            row = len(self.jobs)
+            self.rows[job.id] = row
+            self.jobs.append(job)
+            self.table.insertRow(row)
+            for col in range(3):
+                self.table.setItem(row, col, QTableWidgetItem())
+            self.table.item(row, 0).setText(job.title)
+        status_item = self.table.item(row, 1)
+        status_item.setText(RENDER_JOB_STATUS_TEXT[job.status])
+        status_item.setForeground(QColor({"failed": "#d13438", "done": "#107c10", "running": "#0078d4"}.get(job.status, "#666666")))
+        self.table.item(row, 2).setText(job.detail)
+        self.table.item(row, 2).setToolTip(job.detail)
+        if job is self.selected_job(): self.update_buttons()
+
+    def on_job_output(self, job: RenderJob, text: str) -> None:
+        if job is not self.selected_job(): return
+        self.log_view.moveCursor(QTextCursor.MoveOperation.End)
+        self.log_view.insertPlainText(text)
+        self.log_view.ensureCursorVisible()
+
+    def on_selection_changed(self) -> None:
+        job = self.selected_job()
+        self.log_view.setPlainText("".join(job.log) if job else "")
+        self.log_view.moveCursor(QTextCursor.MoveOperation.End)
+        self.update_buttons()
+
+    def update_buttons(self) -> None:
+        job = self.selected_job()
+        self.btn_cancel.setEnabled(job is not None and not job.finished)
+        self.btn_open.setEnabled(job is not None and job.status == "done")
+
+    def cancel_selected(self) -> None:
+        job = self.selected_job()
+        if job: self.queue.cancel(job)
+
+    def open_output(self) -> None:
+        job = self.selected_job()
+        if job and job.status == "done":
+            QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(job.plan.output_path)))
+
+    def clear_finished(self) -> None:
+        self.queue.remove_finished()
+        for row in reversed(range(len(self.jobs))):
+            if self.jobs[row].finished:
+                self.table.removeRow(row)
+                del self.jobs[row]
+        self.rows = {job.id: row for row, job in enumerate(self.jobs)}
+        self.on_selection_changed()
+
+# === 自动保存 ===
+class AutosaveService(QObject):
+    """项目保存与自动保存：在 GUI 线程上只截取快照 (元组共享，开销很小)，序列化与写盘在后台单线程中按顺序执行
+
+    自动保存写入 AUTOSAVE_DIR 下的检查点文件，两次完整检查点之间只向日志追加增量记录；
+    程序异常退出后可由检查点加日志恢复。
+    """
+    saved = pyqtSignal(str, object) # 路径, 错误信息 (成功为 None)
+    autosave_failed = pyqtSignal(str) # 错误信息，由后台线程发出
+
+    def __init__(self, capture: Callable[[], SceneState], parent=None):
+        super().__init__(parent)
+        self.capture = capture
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.project_path: Optional[str] = None
+        self.binary = True
+        self._checkpoint_state: Optional[SceneState] = None # 最近一次写入检查点的状态
+        self._journal_state: Optional[SceneState] = capture() # 检查点加日志所代表的状态
+        self._journal_entries = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.autosave)
+        self.timer.start(AUTOSAVE_INTERVAL_MS)
+        self.autosave_failed.connect(self.on_autosave_failed)
+
+    def autosave_paths(self, project_path: Optional[str] = None) -> Tuple[str, str]:
+        project_path = project_path if project_path is not None else self.project_path
+        if project_path:
+            key = hashlib.sha256(os.path.abspath(project_path).encode("utf-8")).hexdigest()[:16]
+            stem = f"{os.path.splitext(os.path.basename(project_path))[0]}-{key}"
+        else:
+            stem = "untitled"
+        base = os.path.join(AUTOSAVE_DIR, stem)
+        return base + FILE_EXTENSION, base + ".journal"
+
+    def set_project(self, path: Optional[str], binary: bool, state: Optional[SceneState] = None) -> None:
+        # 打开项目后，下一次自动保存总是写完整检查点
+        # 原项目 (含未命名) 的自动保存文件可能是未保存内容的唯一副本，这里不删除，只在保存成功或用户放弃恢复后删除
+        self.project_path = path
+        self.binary = binary
+        self._checkpoint_state = None
+        self._journal_state = state
+        self._journal_entries = 0
+
+    def save(self, path: str, binary: bool) -> None:
+        # 保存或另存为：之后的自动保存写到新路径对应的文件；原路径的自动保存文件等写盘成功后再删除
+        state = self.capture()
+        autosave_files = tuple(dict.fromkeys(self.autosave_paths(path) + self.autosave_paths()))
+        self.project_path = path
+        self.binary = binary
+        self.executor.submit(self._save_job, path, state, binary, autosave_files)
+        self._journal_state = state
+        self._checkpoint_state = None
+
+    def _save_job(self, path: str, state: SceneState, binary: bool, autosave_files: Tuple[str, str]) -> None:
+        try:
+            write_project_file(path, state[0], state[1], binary=binary)
+        except Exception as e:
+            self.saved.emit(path, str(e))
+            return
+        # 项目已保存，该项目 (及保存前所在路径) 的自动保存文件不再需要
+        for file_path in autosave_files:
+            remove_file(file_path)
+        self.saved.emit(path, None)
+
+    def autosave(self) -> None:
+        state = self.capture()
+        if self._journal_state is not None and diff_scene_states(self._journal_state, state) is None:
+            return
+        checkpoint_path, journal_path = self.autosave_paths()
+        if self._checkpoint_state is None or self._journal_entries >= AUTOSAVE_JOURNAL_MAX_ENTRIES:
+            self.executor.submit(self._checkpoint_job, checkpoint_path, journal_path, state)
+            self._checkpoint_state = state
+            self._journal_entries = 0
+        else:
+            self.executor.submit(self._journal_job, journal_path, self._journal_state, state)
+            self._journal_entries += 1
+        self._journal_state = state
+
+    def _checkpoint_job(self, checkpoint_path: str, journal_path: str, state: SceneState) -> None:
+        try:
+            os.makedirs(AUTOSAVE_DIR, exist_ok=True)
+            write_project_file(checkpoint_path, state[0], state[1])
+            remove_file(journal_path)
+        except Exception as e:
+            self.autosave_failed.emit(f"自动保存失败: {e}")
+
+    def _journal_job(self, journal_path: str, old: SceneState, new: SceneState) -> None:
+        record = diff_scene_states(old, new)
+        if record is None: return
+        try:
+            with open(journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            self.autosave_failed.emit(f"自动保存日志写入失败: {e}")
+
+    def on_autosave_failed(self, error: str) -> None:
+        # 在 GUI 线程上执行：下一次自动保存改写完整检查点
+        self._checkpoint_state = None
+
+    def recoverable(self, project_path: Optional[str] = None) -> bool:
+        # 自动保存检查点比项目文件更新时才视为可恢复
+        checkpoint_path, _ = self.autosave_paths(project_path)
+        if not os.path.exists(checkpoint_path): return False
+        if project_path and os.path.exists(project_path):
+            return os.path.getmtime(checkpoint_path) > os.path.getmtime(project_path)
+        return True
+
+    def recover(self, project_path: Optional[str] = None) -> SceneState:
+        checkpoint_path, journal_path = self.autosave_paths(project_path)
+        reader = ProjectReader(checkpoint_path)
+        state = (tuple(reader.iter_snapshots("mobjects", MobjectData)), tuple(reader.iter_snapshots("animations", AnimationData)))
+        return replay_journal(state, journal_path)
+
+    def discard(self, project_path: Optional[str] = None) -> None:
+        for file_path in self.autosave_paths(project_path):
+            self.executor.submit(remove_file, file_path)
+
+    def shutdown(self) -> None:
+        self.timer.stop()
+        self.executor.shutdown(wait=True)
 
 # === 主窗口 ===
 class ManimEditor(QMainWindow):
@@ -1475,16 +3281,23 @@ class ManimEditor(QMainWindow):
         # 设置图标逻辑 (自动寻找目录下的图标)
         self.setWindowIcon(QIcon(findfile(EDITOR_ICON)))
 
-        self.mobjects: List[MobjectData] = []
-        self.animations: List[AnimationData] = []
+        self.scene_model = SceneModel()
+        self.autosave = AutosaveService(self.capture_state, self)
+        self.autosave.saved.connect(self.on_project_saved)
+        self.autosave.autosave_failed.connect(lambda error: self.console_output.append(error))
+        self.script_generator = ScriptGenerator()
+        self.last_render_fingerprint: Optional[str] = None # 最近一次成功渲染的脚本与参数指纹
+        self.render_queue = RenderQueue(RENDER_SHARD_WORKERS, self)
+        self.render_queue.job_finished.connect(self.on_render_job_finished)
         
         self.is_syncing_selection = False
         self.current_project_path: Optional[str] = None 
+        self.current_project_binary = True # 保存时沿用项目原有格式，旧版 JSON 项目仍保存为 JSON
 
-        self.undo_stack: List[Tuple[List[MobjectData], List[AnimationData]]] = []
-        self.redo_stack: List[Tuple[List[MobjectData], List[AnimationData]]] = []
         self.max_history = 50
-        self.temp_state_snapshot: Optional[Tuple[List[MobjectData], List[AnimationData]]] = None 
+        self.undo_stack: Deque[SceneState] = deque(maxlen=self.max_history)
+        self.redo_stack: Deque[SceneState] = deque(maxlen=self.max_history)
+        self.temp_state_snapshot: Optional[SceneState] = None 
 
         self.setStyleSheet(
 """
@@ -1494,8 +3307,8 @@ QToolBar { background-color: #ffffff; border-bottom: 1px solid #e0e0e0; spacing:
 QToolButton { background-color: transparent; border: 1px solid transparent; border-radius: 3px; padding: 4px; color: #444; }
 QToolButton:hover { background-color: #f0f0f0; border: 1px solid #c0c0c0; }
 QLabel#PanelHeader { font-weight: bold; color: #0078d4; padding: 8px; background-color: #f9f9f9; border-bottom: 2px solid #0078d4; }
-QListWidget, QLineEdit, QComboBox, QFontComboBox, QTextEdit { background-color: #ffffff; border: 1px solid #a0a0a0; border-radius: 2px; padding: 4px; }
-QListWidget::item:selected { background-color: #eff6fc; border: 1px solid #0078d4; color: #000; }
+QListView, QLineEdit, QComboBox, QTextEdit { background-color: #ffffff; border: 1px solid #a0a0a0; border-radius: 2px; padding: 4px; }
+QListView::item:selected { background-color: #eff6fc; border: 1px solid #0078d4; color: #000; }
 QLineEdit:focus, QComboBox:focus { border: 1px solid #0078d4; }
 QPushButton { background-color: #ffffff; border: 1px solid #a0a0a0; color: #333; padding: 5px 12px; border-radius: 3px; }
 QPushButton:hover { background-color: #f0f0f0; border-color: #0078d4; color: #0078d4; }
@@ -1507,6 +3320,7 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
 """
         )
         self.init_ui()
+        self.scene_model.add_listener(self.on_scene_changed)
 
     def init_ui(self) -> None:
         # === 菜单栏 ===
@@ -1561,6 +3375,32 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         toolbar.addSeparator()
         toolbar.addAction(self.act_undo)
         toolbar.addAction(self.act_redo)
+        toolbar.addSeparator()
+
+        arrange_menu = QMenu(self)
+        for text, icon_name, op in [
+            ("左对齐", 'fa5s.align-left', lambda c: c.align("left")),
+            ("水平居中", 'fa5s.align-center', lambda c: c.align("h_center")),
+            ("右对齐", 'fa5s.align-right', lambda c: c.align("right")),
+            ("顶端对齐", None, lambda c: c.align("top")),
+            ("垂直居中", None, lambda c: c.align("v_center")),
+            ("底端对齐", None, lambda c: c.align("bottom")),
+            (None, None, None),
+            ("水平等距分布", 'fa5s.grip-horizontal', lambda c: c.distribute("x")),
+            ("垂直等距分布", 'fa5s.grip-vertical', lambda c: c.distribute("y")),
+        ]:
+            if text is None:
+                arrange_menu.addSeparator()
+                continue
+            act = arrange_menu.addAction(qta.icon(icon_name, color='#444') if icon_name else QIcon(), text)
+            act.triggered.connect(lambda checked, op=op: self.arrange_selected(op))
+        btn_arrange = QToolButton()
+        btn_arrange.setText("排列")
+        btn_arrange.setIcon(qta.icon('fa5s.th-large', color='#444'))
+        btn_arrange.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        btn_arrange.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        btn_arrange.setMenu(arrange_menu)
+        toolbar.addWidget(btn_arrange)
 
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -1578,11 +3418,18 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         left_layout.setContentsMargins(0,0,0,0)
         left_layout.addWidget(QLabel("对象列表", objectName="PanelHeader"))
         
-        self.mob_list_widget = QListWidget()
+        self.mob_list_model = MobjectListModel(self)
+        self.mob_list_widget = QListView()
+        self.mob_list_widget.setModel(self.mob_list_model)
+        self.mob_list_widget.setUniformItemSizes(True)
         self.mob_list_widget.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
-        self.mob_list_widget.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
-        self.mob_list_widget.itemSelectionChanged.connect(self.sync_selection_list_to_canvas)
-        self.mob_list_widget.itemSelectionChanged.connect(self.update_property_panel)
+        mob_delegate = MobjectItemDelegate(self.mob_list_widget)
+        # 删除会移除当前行，排队执行以免在委托事件处理中途修改模型
+        mob_delegate.visibility_clicked.connect(self.toggle_mobject_visibility, Qt.ConnectionType.QueuedConnection)
+        mob_delegate.delete_clicked.connect(self.delete_mobject, Qt.ConnectionType.QueuedConnection)
+        self.mob_list_widget.setItemDelegate(mob_delegate)
+        self.mob_list_widget.selectionModel().selectionChanged.connect(self.sync_selection_list_to_canvas)
+        self.mob_list_widget.selectionModel().selectionChanged.connect(self.update_property_panel)
         left_layout.addWidget(self.mob_list_widget)
         splitter.addWidget(left_panel)
         
@@ -1618,6 +3465,22 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         self.render_progress_bar.setStyleSheet("max-height: 8px;")
         
         zoom_layout.addWidget(self.render_progress_bar)
+
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setVisible(False)
+        self.load_progress_bar.setFixedWidth(200)
+        self.load_progress_bar.setFormat("加载公式 %v/%m")
+        self.load_progress_bar.setStyleSheet("max-height: 14px;")
+
+        self.btn_cancel_load = QToolButton()
+        self.btn_cancel_load.setIcon(qta.icon('fa5s.times', color='#d13438'))
+        self.btn_cancel_load.setToolTip("取消加载")
+        self.btn_cancel_load.setFixedSize(24, 24)
+        self.btn_cancel_load.setVisible(False)
+        self.btn_cancel_load.clicked.connect(lambda: self.canvas.cancel_deferred_load())
+
+        zoom_layout.addWidget(self.load_progress_bar)
+        zoom_layout.addWidget(self.btn_cancel_load)
         zoom_layout.addStretch() 
         
         self.zoom_out_btn = QToolButton()
@@ -1649,15 +3512,21 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         zoom_layout.addWidget(self.zoom_label)
         
         self.canvas.scale_changed.connect(self.sync_zoom_ui)
+        self.canvas.load_progress.connect(self.on_load_progress)
+        self.canvas.load_finished.connect(self.on_load_finished)
         
         cc_layout.addWidget(self.zoom_bar)
         center_layout.addWidget(canvas_container)
         
+        self.bottom_tabs = QTabWidget()
+        self.bottom_tabs.setMinimumHeight(150)
         self.console_output = QTextEdit()
         self.console_output.setReadOnly(True)
-        self.console_output.setMinimumHeight(150)
         self.console_output.setPlaceholderText("准备就绪...")
-        center_layout.addWidget(self.console_output)
+        self.render_queue_panel = RenderQueuePanel(self.render_queue)
+        self.bottom_tabs.addTab(self.console_output, qta.icon('fa5s.terminal', color='#555'), "控制台")
+        self.bottom_tabs.addTab(self.render_queue_panel, qta.icon('fa5s.tasks', color='#555'), "渲染队列")
+        center_layout.addWidget(self.bottom_tabs)
         
         settings_bar = QWidget()
         sb_layout = QHBoxLayout(settings_bar)
@@ -1673,6 +3542,13 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         self.frame_rate_combo = QComboBox()
         self.frame_rate_combo.addItems(["15", "30", "60"])
         self.frame_rate_combo.setCurrentIndex(2)
+
+        self.render_jobs_combo = QComboBox()
+        self.render_jobs_combo.setToolTip("同时运行的渲染进程数 (所有排队任务共享)")
+        job_counts = sorted({n for n in (1, 2, 4, 8, 16, 32) if n < RENDER_SHARD_WORKERS} | {RENDER_SHARD_WORKERS})
+        self.render_jobs_combo.addItems([str(n) for n in job_counts])
+        self.render_jobs_combo.setCurrentText(str(RENDER_SHARD_WORKERS))
+        self.render_jobs_combo.currentTextChanged.connect(lambda text: self.render_queue.set_max_processes(int(text)))
         
         self.btn_render_big = QPushButton(" 开始渲染")
         self.btn_render_big.setObjectName("RenderBtn")
@@ -1680,6 +3556,11 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         self.btn_render_big.setCursor(Qt.CursorShape.PointingHandCursor)
         self.btn_render_big.setToolTip("开始渲染视频")
         self.btn_render_big.clicked.connect(self.render_video)
+
+        self.btn_batch_render = QPushButton(" 批量渲染")
+        self.btn_batch_render.setIcon(qta.icon('fa5s.layer-group', color='#555'))
+        self.btn_batch_render.setToolTip("将多个项目或多种画质加入渲染队列")
+        self.btn_batch_render.clicked.connect(self.batch_render)
         
         sb_layout.addWidget(QLabel("文件:"))
         sb_layout.addWidget(self.input_scene_name)
@@ -1687,7 +3568,10 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         sb_layout.addWidget(self.quality_combo)
         sb_layout.addWidget(QLabel("帧率:"))
         sb_layout.addWidget(self.frame_rate_combo)
+        sb_layout.addWidget(QLabel("并行:"))
+        sb_layout.addWidget(self.render_jobs_combo)
         sb_layout.addStretch()
+        sb_layout.addWidget(self.btn_batch_render)
         sb_layout.addWidget(self.btn_render_big)
         
         center_layout.addWidget(settings_bar)
@@ -1700,9 +3584,14 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         anim_layout = QVBoxLayout(self.anim_container)
         anim_layout.setContentsMargins(0,0,0,0)
         anim_layout.addWidget(QLabel("动画序列", objectName="PanelHeader"))
-        self.anim_list_widget = QListWidget()
-        self.anim_list_widget.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
-        self.anim_list_widget.itemDoubleClicked.connect(self.edit_animation_dialog)
+        self.anim_list_model = AnimationListModel(self.describe_animation, self)
+        self.anim_list_widget = QListView()
+        self.anim_list_widget.setModel(self.anim_list_model)
+        self.anim_list_widget.setUniformItemSizes(True)
+        anim_delegate = AnimationItemDelegate(self.anim_list_widget)
+        anim_delegate.delete_clicked.connect(self.delete_animation, Qt.ConnectionType.QueuedConnection)
+        self.anim_list_widget.setItemDelegate(anim_delegate)
+        self.anim_list_widget.doubleClicked.connect(self.edit_animation_dialog)
         anim_layout.addWidget(self.anim_list_widget)
         
         self.prop_panel = ObjectPropertyPanel()
@@ -1728,6 +3617,21 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         
         self.update_undo_redo_actions()
 
+    def report_startup_time(self) -> None:
+        elapsed = time.perf_counter() - STARTUP_TIME
+        self.console_output.append(f"启动耗时: {elapsed:.2f} 秒")
+        if elapsed > STARTUP_BUDGET_SECONDS:
+            self.console_output.append(f"启动超出 {STARTUP_BUDGET_SECONDS:.1f} 秒预算 (首次启动需要建立字体与公式缓存)")
+
+    def closeEvent(self, event) -> None:
+        # 正常退出时丢弃自动保存文件，只保留异常退出留下的
+        self.autosave.discard()
+        self.autosave.shutdown()
+        self.render_queue.shutdown()
+        TEX_DISK_CACHE.flush()
+        get_compile_process_pool().shutdown()
+        super().closeEvent(event)
+
     def save_project(self):
         if not self.current_project_path:
             self.save_project_as()
@@ -1735,42 +3639,66 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
             self._write_to_file(self.current_project_path)
 
     def save_project_as(self):
-        file_path, _ = QFileDialog.getSaveFileName(self, "另存为", "", f"{FILE_DESCRIPTION} (*{FILE_EXTENSION})")
+        binary_filter = f"{FILE_DESCRIPTION} (*{FILE_EXTENSION})"
+        json_filter = f"{FILE_DESCRIPTION} - JSON (*{FILE_EXTENSION})"
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "另存为", "", f"{binary_filter};;{json_filter}")
         if file_path:
             if not file_path.endswith(FILE_EXTENSION):
                 file_path += FILE_EXTENSION
             self.current_project_path = file_path
+            self.current_project_binary = selected_filter != json_filter
             self._write_to_file(file_path)
 
     def _write_to_file(self, path):
-        try:
-            data = {
-                "mobjects": [asdict(m) for m in self.mobjects],
-                "animations": [asdict(a) for a in self.animations]
-            }
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+        # 快照在此截取，写盘在后台完成，结果由 on_project_saved 报告
+        self.autosave.save(path, self.current_project_binary)
+
+    def on_project_saved(self, path: str, error: Optional[str]) -> None:
+        if error:
+            QMessageBox.critical(self, "保存失败", error)
+        else:
             self.console_output.append(f"项目已保存: {path}")
-            QMessageBox.information(self, "成功", "项目已保存！")
+
+    def check_autosave_recovery(self, project_path: Optional[str] = None) -> bool:
+        # 返回是否已恢复
+        if not self.autosave.recoverable(project_path): return False
+        reply = QMessageBox.question(self, "恢复自动保存", "检测到上次异常退出时自动保存的内容，是否恢复？")
+        if reply != QMessageBox.StandardButton.Yes:
+            self.autosave.discard(project_path)
+            return False
+        try:
+            state = self.autosave.recover(project_path)
         except Exception as e:
-            QMessageBox.critical(self, "保存失败", str(e))
+            QMessageBox.critical(self, "恢复失败", f"自动保存文件已损坏: {str(e)}")
+            self.autosave.discard(project_path)
+            return False
+        self.save_to_history()
+        self.restore_state(state)
+        self.console_output.append("已从自动保存恢复，确认无误后请保存项目")
+        return True
 
     def load_project_from_file(self, file_path):
         if not os.path.exists(file_path): return
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data: dict = json.load(f)
-            
-            new_mobs = [MobjectData(**d) for d in data.get("mobjects", [])]
-            new_anims = [AnimationData(**d) for d in data.get("animations", [])]
+            reader = ProjectReader(file_path)
+            mob_snapshots = tuple(reader.iter_snapshots("mobjects", MobjectData))
+            anim_snapshots = tuple(reader.iter_snapshots("animations", AnimationData))
+            # 模板哈希未知时跳过预热，未缓存的公式由后台加载任务从磁盘缓存读取或编译
+            template_hash = get_tex_template_hash()
+            if template_hash is not None:
+                type_index, content_index = MOBJECT_FIELD_INDEX["mob_type"], MOBJECT_FIELD_INDEX["content"]
+                TEX_DISK_CACHE.preload([s[content_index] for s in mob_snapshots if s[type_index] == "MathTex"], TEX_SVG_CACHE, template_hash)
             
             self.undo_stack.clear()
             self.redo_stack.clear()
             self.update_undo_redo_actions()
             
             self.current_project_path = file_path
-            self.restore_state((new_mobs, new_anims))
+            self.current_project_binary = reader.is_binary
+            self.restore_state((mob_snapshots, anim_snapshots))
+            self.autosave.set_project(file_path, reader.is_binary, self.capture_state())
             self.console_output.append(f"已加载项目: {file_path}")
+            self.check_autosave_recovery(file_path)
             
         except Exception as e:
             QMessageBox.critical(self, "加载失败", f"文件格式错误或损坏: {str(e)}")
@@ -1780,63 +3708,82 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         if file_path:
             self.load_project_from_file(file_path)
 
+    @property
+    def mobjects(self) -> List[MobjectData]:
+        return self.scene_model.mobjects
+
+    @property
+    def animations(self) -> List[AnimationData]:
+        return self.scene_model.animations
+
+    def on_scene_changed(self, event: str, payload: Any) -> None:
+        # 场景模型的变更通知统一在此分发到画布与列表
+        if event == "mobject_added":
+            self.canvas.add_visual_item(payload, self.refresh_ui_dummy, self.handle_item_manipulation)
+            self.mob_list_model.append_object(payload)
+        elif event == "mobject_removed":
+            self.canvas.remove_visual_item(payload.id)
+            self.mob_list_model.remove_id(payload.id)
+        elif event == "mobject_changed":
+            self.canvas.sync_item_from_data(payload.id)
+            self.mob_list_model.update_id(payload.id)
+        elif event == "animation_added":
+            self.anim_list_model.append_object(payload)
+        elif event == "animation_removed":
+            self.anim_list_model.remove_id(payload.id)
+        elif event == "animation_changed":
+            self.anim_list_model.update_id(payload.id)
+        elif event == "reset":
+            self.apply_state_diff(*payload)
+
+    def selected_mob_ids(self) -> List[str]:
+        return [index.data(Qt.ItemDataRole.UserRole) for index in self.mob_list_widget.selectionModel().selectedRows()]
+
     def update_property_panel(self):
-        selected_items = self.mob_list_widget.selectedItems()
-        if len(selected_items) == 1:
-            mob_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-            mob = next((m for m in self.mobjects if m.id == mob_id), None)
-            self.prop_panel.set_mobject(mob)
+        selected_ids = self.selected_mob_ids()
+        if len(selected_ids) == 1:
+            self.prop_panel.set_mobject(self.scene_model.mobject(selected_ids[0]))
         else:
             self.prop_panel.set_mobject(None)
 
     def handle_property_panel_change(self, field: str, value: Any, save_history: bool):
-        selected_items = self.mob_list_widget.selectedItems()
-        if not selected_items: return
-        mob_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        mob = next((m for m in self.mobjects if m.id == mob_id), None)
+        selected_ids = self.selected_mob_ids()
+        if not selected_ids: return
+        mob = self.scene_model.mobject(selected_ids[0])
         if not mob: return
 
         if save_history:
             self.save_to_history()
 
-        if field == "name":
-            mob.name = value
-            self.refresh_ui() 
-        elif field == "color":
-            mob.color = value
-            self.canvas.update_item_content(mob.id)
-        elif field == "content":
-            mob.content = value
-            self.canvas.update_item_content(mob.id)
-        elif field == "font":
-            mob.font = value
-            self.canvas.update_item_content(mob.id)
+        if field in ("name", "color", "content", "font"):
+            self.scene_model.update_mobject(mob, **{field: value})
 
     def on_zoom_slider_change(self, value: int) -> None:
         self.zoom_label.setText(f"{value}%")
         self.canvas.set_zoom(value)
 
+    def on_load_progress(self, done: int, total: int) -> None:
+        self.load_progress_bar.setRange(0, total)
+        self.load_progress_bar.setValue(done)
+        self.load_progress_bar.setVisible(True)
+        self.btn_cancel_load.setVisible(True)
+
+    def on_load_finished(self, cancelled: bool) -> None:
+        self.load_progress_bar.setVisible(False)
+        self.btn_cancel_load.setVisible(False)
+        if cancelled:
+            self.console_output.append("已取消公式加载，未加载的公式将以占位框显示")
+
     def sync_zoom_ui(self, percent: int) -> None:
         self.zoom_slider.blockSignals(True)
         self.zoom_slider.setValue(percent)
         self.zoom_label.setText(f"{percent}%")
         self.zoom_slider.blockSignals(False)
 
-    def set_ui_locked(self, locked: bool) -> None:
-        self.act_add_mob.setEnabled(not locked)
-        self.act_add_anim.setEnabled(not locked)
-        self.btn_render_big.setEnabled(not locked)
-        self.input_scene_name.setEnabled(not locked)
-        self.quality_combo.setEnabled(not locked)
-        self.frame_rate_combo.setEnabled(not locked)
-        if locked: QApplication.setOverrideCursor(Qt.CursorShape.ForbiddenCursor)
-        else: QApplication.restoreOverrideCursor()
-
     def sync_selection_list_to_canvas(self) -> None:
         if self.is_syncing_selection: return
         self.is_syncing_selection = True
-        selected_items = self.mob_list_widget.selectedItems()
-        selected_ids = {item.data(Qt.ItemDataRole.UserRole) for item in selected_items}
+        selected_ids = set(self.selected_mob_ids())
         self.canvas.scene.clearSelection()
         for mob_id, item in self.canvas.items_map.items():
             if mob_id in selected_ids: item.setSelected(True)
@@ -1850,21 +3797,36 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         for item in selected_items:
             if isinstance(item, VisualMobjectItem):
                 selected_ids.add(item.mob_data.id)
-        self.mob_list_widget.clearSelection()
-        for i in range(self.mob_list_widget.count()):
-            item = self.mob_list_widget.item(i)
-            if item.data(Qt.ItemDataRole.UserRole) in selected_ids:
-                item.setSelected(True)
+        self.select_mob_rows(selected_ids)
         self.is_syncing_selection = False
 
-    def capture_state(self) -> Tuple[List[MobjectData], List[AnimationData]]:
-        return (copy.deepcopy(self.mobjects), copy.deepcopy(self.animations))
+    def select_mob_rows(self, mob_ids: set) -> None:
+        selection = QItemSelection()
+        for mob_id in mob_ids:
+            index = self.mob_list_model.index_of(mob_id)
+            if index.isValid(): selection.select(index, index)
+        self.mob_list_widget.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+
+    def capture_state(self) -> SceneState:
+        return (tuple(m.snapshot() for m in self.mobjects), tuple(a.snapshot() for a in self.animations))
+
+    def history_memory_usage(self) -> Dict[str, int]:
+        # 统计历史栈实际占用: 共享的快照只计一次 (字段值本身与当前对象共享，不计入)
+        seen = set()
+        total = 0
+        states = list(self.undo_stack) + list(self.redo_stack)
+        for state in states:
+            for part in state:
+                total += sys.getsizeof(part)
+                for snap in part:
+                    if id(snap) not in seen:
+                        seen.add(id(snap))
+                        total += sys.getsizeof(snap)
+        return {"states": len(states), "unique_snapshots": len(seen), "bytes": total}
 
     def save_to_history(self) -> None:
         state = self.capture_state()
         self.undo_stack.append(state)
-        if len(self.undo_stack) > self.max_history:
-            self.undo_stack.pop(0)
         self.redo_stack.clear()
         self.update_undo_redo_actions()
 
@@ -1888,38 +3850,61 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         self.restore_state(next_state)
         self.update_undo_redo_actions()
 
-    def restore_state(self, state: Tuple[List[MobjectData], List[AnimationData]]) -> None:
+    @staticmethod
+    def materialize_snapshots(snapshots: Tuple[tuple, ...], live_objects: List[Any], cls: type) -> List[Any]:
+        # 快照未变化的对象直接复用当前实例，只为变化的对象创建新实例
+        live = {obj.id: obj for obj in live_objects}
+        result = []
+        for snap in snapshots:
+            obj = live.get(snap[0])
+            if obj is None or (obj.snapshot() is not snap and obj.snapshot() != snap):
+                obj = cls.from_snapshot(snap)
+            result.append(obj)
+        return result
+
+    def restore_state(self, state: SceneState) -> None:
         mobs_snapshot, anims_snapshot = state
-        self.mobjects = mobs_snapshot
-        self.animations = anims_snapshot
-        self.refresh_ui() 
-        self.sync_canvas_visuals()
+        mobjects = self.materialize_snapshots(mobs_snapshot, self.mobjects, MobjectData)
+        animations = self.materialize_snapshots(anims_snapshot, self.animations, AnimationData)
+        self.scene_model.replace(mobjects, animations)
         self.update_property_panel()
 
-    def sync_canvas_visuals(self) -> None:
-        current_ids = set()
-        for mob in self.mobjects:
-            current_ids.add(mob.id)
-            if mob.id in self.canvas.items_map:
-                item: VisualMobjectItem = self.canvas.items_map[mob.id]
-                item.mob_data = mob 
-                item.setScale(mob.scale)
-                item.setVisible(mob.visible) 
-                item.update_position_from_data()
-                item.update_content()
-                item.update_tooltip()
-                item.update()
-            else:
-                self.canvas.add_visual_item(mob, self.refresh_ui_dummy, self.handle_item_manipulation)
-                if mob.id in self.canvas.items_map:
-                    self.canvas.items_map[mob.id].setVisible(mob.visible)
-
-        ids_to_remove = []
-        for mid in self.canvas.items_map.keys():
-            if mid not in current_ids:
-                ids_to_remove.append(mid)
-        for mid in ids_to_remove:
+    def apply_state_diff(self, old_mobs: List[MobjectData], old_anims: List[AnimationData]) -> None:
+        # materialize_snapshots 复用未变化的实例，因此以对象身份即可判断哪些条目需要更新
+        old_mob_map = {m.id: m for m in old_mobs}
+        new_mob_ids = {m.id for m in self.mobjects}
+        changed_mobs = [m for m in self.mobjects if old_mob_map.get(m.id) is not m]
+        removed_mob_ids = [mid for mid in old_mob_map if mid not in new_mob_ids]
+
+        for mid in removed_mob_ids:
             self.canvas.remove_visual_item(mid)
+        for mob in changed_mobs:
+            self.sync_canvas_item(mob)
+        if changed_mobs:
+            self.canvas.start_deferred_load()
+
+        old_anim_map = {a.id: a for a in old_anims}
+        changed_anim_ids = {a.id for a in self.animations if old_anim_map.get(a.id) is not a}
+        self.mob_list_model.sync(self.mobjects, set())
+        self.anim_list_model.sync(self.animations, changed_anim_ids)
+
+    def sync_canvas_item(self, mob: MobjectData) -> None:
+        if mob.id in self.canvas.items_map:
+            item: VisualMobjectItem = self.canvas.items_map[mob.id]
+            old = item.mob_data
+            item.mob_data = mob 
+            if old is mob: return
+            if item.scale() != mob.scale: item.setScale(mob.scale)
+            if item.isVisible() != mob.visible: item.setVisible(mob.visible) 
+            item.update_position_from_data()
+            if (old.mob_type, old.content, old.color, old.font) != (mob.mob_type, mob.content, mob.color, mob.font):
+                item.update_content()
+            item.update_tooltip()
+            item.update()
+        else:
+            self.canvas.add_visual_item(mob, self.refresh_ui_dummy, self.handle_item_manipulation, defer_content=True)
+            if mob.id in self.canvas.items_map:
+                self.canvas.items_map[mob.id].setVisible(mob.visible)
 
     def handle_item_manipulation(self, state_type: str) -> None:
         if state_type == "start":
@@ -1928,25 +3913,46 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
             if self.temp_state_snapshot:
                 if self.has_state_changed(self.temp_state_snapshot):
                     self.undo_stack.append(self.temp_state_snapshot)
-                    if len(self.undo_stack) > self.max_history:
-                        self.undo_stack.pop(0)
                     self.redo_stack.clear()
                     self.update_undo_redo_actions()
                 self.temp_state_snapshot = None
 
-    def has_state_changed(self, old_state: Tuple[List[MobjectData], List[AnimationData]]) -> bool:
+    def has_state_changed(self, old_state: SceneState) -> bool:
         old_mobs, old_anims = old_state
         if len(old_mobs) != len(self.mobjects): return True
         for om, nm in zip(old_mobs, self.mobjects):
-            if (om.x != nm.x or om.y != nm.y or om.scale != nm.scale):
+            snap = nm.snapshot()
+            if om is not snap and om != snap:
                 return True
         return False
 
+    def arrange_selected(self, op: Callable[[MobjectColumns], None]) -> None:
+        mobs = [m for m in (self.scene_model.mobject(mid) for mid in self.selected_mob_ids()) if m is not None]
+        if len(mobs) < 2: return
+        columns = MobjectColumns(mobs)
+        # 包围盒取自画布图形 (场景像素)，换算为相对对象中心的 Manim 单位偏移
+        bounds = np.zeros((len(mobs), 4))
+        for i, mob in enumerate(mobs):
+            item = self.canvas.items_map.get(mob.id)
+            if item is None: continue
+            rect = item.sceneBoundingRect()
+            k = item.scene_scale
+            bounds[i] = (rect.left() * k - mob.x, rect.right() * k - mob.x, -rect.bottom() * k - mob.y, -rect.top() * k - mob.y)
+        columns.set_extents(bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3])
+        before = self.capture_state()
+        op(columns)
+        changed = columns.write_back()
+        if not changed: return
+        self.undo_stack.append(before)
+        self.redo_stack.clear()
+        self.update_undo_redo_actions()
+        for mob in changed:
+            self.scene_model.update_mobject(mob)
+
     def delete_selected(self) -> None:
-        selected_items = self.mob_list_widget.selectedItems()
-        if not selected_items: return
+        ids_to_delete = self.selected_mob_ids()
+        if not ids_to_delete: return
         self.save_to_history() 
-        ids_to_delete = [item.data(Qt.ItemDataRole.UserRole) for item in selected_items]
         for mob_id in ids_to_delete:
             self.delete_mobject(mob_id, record_history=False) 
 
@@ -1966,11 +3972,9 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
             self.save_to_history()
             data = dlg.get_data()
             new_mob = MobjectData(str(uuid.uuid4()), data["name"], data["type"], data["color"], data["content"], data["font"])
-            self.mobjects.append(new_mob)
-            self.canvas.add_visual_item(new_mob, self.refresh_ui_dummy, self.handle_item_manipulation)
-            self.refresh_ui()
+            self.scene_model.add_mobject(new_mob)
 
-    def edit_mobject_dialog(self, item: QListWidgetItem) -> None:
+    def edit_mobject_dialog(self, index: QModelIndex) -> None:
         pass
 
     def add_animation_dialog(self) -> None:
@@ -1992,186 +3996,56 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
         if dlg.exec():
             self.save_to_history()
             d = dlg.get_data()
-            self.animations.append(AnimationData(str(uuid.uuid4()), d["type"], d["target_id"], d["target_name"], d["replacement_id"], d["replacement_name"], d["duration"]))
-            self.refresh_ui()
+            self.scene_model.add_animation(AnimationData(str(uuid.uuid4()), d["type"], d["target_id"], d["target_name"], d["replacement_id"], d["replacement_name"], d["duration"]))
 
-    def edit_animation_dialog(self, item: QListWidgetItem) -> None:
-        anim = next((a for a in self.animations if a.id == item.data(Qt.ItemDataRole.UserRole)), None)
+    def edit_animation_dialog(self, index: QModelIndex) -> None:
+        anim = self.scene_model.animation(index.data(Qt.ItemDataRole.UserRole))
         if not anim: return
-        target_obj = next((m for m in self.mobjects if m.id == anim.target_id), None)
-        if not target_obj:
-            replacement_obj = next((m for m in self.mobjects if m.name == anim.target_name_snapshot), None)
-            if replacement_obj:
-                anim.target_id = replacement_obj.id
-                target_obj = replacement_obj
-            else:
-                QMessageBox.warning(self, "禁止编辑", "该动画绑定的对象已丢失，无法编辑属性。\n请恢复对象或删除此动画。")
-                return
+        if self.scene_model.mobject(anim.target_id) is None:
+            QMessageBox.warning(self, "禁止编辑", "该动画绑定的对象已丢失，无法编辑属性。\n请恢复对象或删除此动画。")
+            return
 
         dlg = AnimationEditDialog(self, self.mobjects, animation=anim)
         if dlg.exec():
             self.save_to_history()
             d = dlg.get_data()
-            anim.target_id = d["target_id"]
-            anim.target_name_snapshot = d["target_name"]
-            anim.replacement_id = d["replacement_id"]
-            anim.replacement_name_snapshot = d["replacement_name"]
-            anim.duration = d["duration"]
-            self.refresh_ui()
+            self.scene_model.update_animation(anim, target_id=d["target_id"], target_name_snapshot=d["target_name"],
+                                              replacement_id=d["replacement_id"], replacement_name_snapshot=d["replacement_name"],
+                                              duration=d["duration"])
 
     def delete_mobject(self, mob_id: str, record_history: bool = True) -> None:
         if record_history: self.save_to_history()
-        mob = next((m for m in self.mobjects if m.id == mob_id), None)
-        if not mob: return
-        self.mobjects.remove(mob)
-        self.canvas.remove_visual_item(mob_id)
-        self.refresh_ui()
+        # 引用该对象的动画通过反向索引找到并刷新为失效状态
+        self.scene_model.remove_mobject(mob_id)
 
     def delete_animation(self, anim_id: str) -> None:
         self.save_to_history()
-        anim = next((a for a in self.animations if a.id == anim_id), None)
-        if anim:
-            self.animations.remove(anim)
-            self.refresh_ui()
+        self.scene_model.remove_animation(anim_id)
 
     def refresh_ui_dummy(self, mid: str) -> None: pass 
 
     def toggle_mobject_visibility(self, mob_id: str):
-        mob = next((m for m in self.mobjects if m.id == mob_id), None)
+        mob = self.scene_model.mobject(mob_id)
         if mob:
-            mob.visible = not mob.visible
-            self.canvas.set_item_visible(mob.id, mob.visible)
-            self.refresh_ui()
-
-    def refresh_ui(self) -> None:
-        self.mob_list_widget.blockSignals(True)
-        self.mob_list_widget.clear()
-        visual_selected = self.canvas.scene.selectedItems()
-        visual_ids = set()
-        for v in visual_selected:
-            if isinstance(v, VisualMobjectItem):
-                visual_ids.add(v.mob_data.id)
-
-        for mob in self.mobjects:
-            item = QListWidgetItem(self.mob_list_widget)
-            item.setSizeHint(QSize(0, 42))
-            item.setData(Qt.ItemDataRole.UserRole, mob.id)
-            w = QWidget()
-            l = QHBoxLayout(w)
-            l.setContentsMargins(5,2,5,2)
-            
-            btn_vis = QToolButton()
-            icon_name = 'fa5s.eye' if mob.visible else 'fa5s.eye-slash'
-            btn_vis.setIcon(qta.icon(icon_name, color='#555'))
-            btn_vis.setAutoRaise(True)
-            btn_vis.clicked.connect(lambda checked, mid=mob.id: self.toggle_mobject_visibility(mid))
-            l.addWidget(btn_vis)
-
-            l.addWidget(QLabel(mob.name, styleSheet="font-weight:bold;"))
-            l.addStretch()
-            l.addWidget(QLabel(mob.mob_type, styleSheet="color:#888; font-size:9pt; margin-right:5px;"))
-            btn_del = QPushButton()
-            btn_del.setObjectName("DelBtn")
-            btn_del.setIcon(qta.icon('fa5s.trash-alt', color='#d13438'))
-            btn_del.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn_del.setToolTip("删除对象")
-            btn_del.clicked.connect(lambda checked, mid=mob.id: self.delete_mobject(mid))
-            l.addWidget(btn_del)
-            self.mob_list_widget.setItemWidget(item, w)
-            if mob.id in visual_ids: item.setSelected(True)
-
-        self.mob_list_widget.blockSignals(False)
-
-        self.anim_list_widget.clear()
-        for i, anim in enumerate(self.animations):
-            item = QListWidgetItem(self.anim_list_widget)
-            item.setSizeHint(QSize(0, 36))
-            item.setData(Qt.ItemDataRole.UserRole, anim.id)
-            target_obj = next((m for m in self.mobjects if m.id == anim.target_id), None)
-            if not target_obj:
-                replacement_obj = next((m for m in self.mobjects if m.name == anim.target_name_snapshot), None)
-                if replacement_obj:
-                    anim.target_id = replacement_obj.id
-                    target_obj = replacement_obj
-            is_valid = (target_obj is not None)
-            display_name = anim.target_name_snapshot
-            if target_obj:
-                display_name = target_obj.name
-                anim.target_name_snapshot = target_obj.name 
-            txt = f"{i+1}. {anim.anim_type}: {display_name}"
-            if anim.anim_type == "Transform": 
-                rep_obj = next((m for m in self.mobjects if m.id == anim.replacement_id), None)
-                if not rep_obj and anim.replacement_name_snapshot:
-                    found_rep = next((m for m in self.mobjects if m.name == anim.replacement_name_snapshot), None)
-                    if found_rep:
-                        anim.replacement_id = found_rep.id
-                        rep_obj = found_rep
-                if not rep_obj: is_valid = False
-                else: anim.replacement_name_snapshot = rep_obj.name
-                txt += f" -> {anim.replacement_name_snapshot}"
-            w = QWidget()
-            l = QHBoxLayout(w)
-            l.setContentsMargins(5,2,5,2)
-            label = QLabel(txt)
-            if not is_valid: label.setStyleSheet("color: red;")
-            l.addWidget(label)
-            l.addStretch()
-            btn_del = QPushButton()
-            btn_del.setObjectName("DelBtn")
-            btn_del.setIcon(qta.icon('fa5s.trash-alt', color='#d13438'))
-            btn_del.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn_del.setToolTip("删除动画")
-            btn_del.clicked.connect(lambda checked, aid=anim.id: self.delete_animation(aid))
-            l.addWidget(btn_del)
-            self.anim_list_widget.setItemWidget(item, w)
-        
-        self.update_property_panel()
+            self.scene_model.update_mobject(mob, visible=not mob.visible)
+
+    def describe_animation(self, anim: AnimationData) -> Tuple[str, bool]:
+        target_obj = self.scene_model.mobject(anim.target_id)
+        is_valid = (target_obj is not None)
+        txt = f"{anim.anim_type}: {target_obj.name if target_obj else anim.target_name_snapshot}"
+        if anim.anim_type == "Transform":
+            rep_obj = self.scene_model.mobject(anim.replacement_id)
+            if not rep_obj: is_valid = False
+            txt += f" -> {rep_obj.name if rep_obj else anim.replacement_name_snapshot}"
+        return txt, is_valid
 
     def generate_script(self) -> str:
         scene_name = self.input_scene_name.text().strip()
         if not scene_name: scene_name = "MyScene"
         class_name = scene_name.replace(' ', '_')
+        return self.script_generator.generate(class_name, *self.capture_state())
 
-        script = "from manim import *\n"
-        script += f"class {class_name}(Scene):\n" 
-        script += "    def construct(self):\n"
-        
-        var_map = {}
-        for i, mob in enumerate(self.mobjects):
-            var_name = f"m{i}"
-            var_map[mob.id] = var_name
-
-            if mob.mob_type == "Square":
-                code = f"Square(side_length=2, color='{mob.color}', fill_opacity=0.5)"
-            elif mob.mob_type == "Circle":
-                code = f"Circle(radius=1, color='{mob.color}', fill_opacity=0.5)"
-            elif mob.mob_type == "Text":
-                code = f"Text('{mob.content}', color='{mob.color}', font='{mob.font}')"
-            elif mob.mob_type == "MathTex":
-                code = f"MathTex(r'{mob.content}', color='{mob.color}')"
-            else:
-                code = "Square()"
-            
-            line = f"        {var_name} = {code}\n"
-            line += f"        {var_name}.move_to([{mob.x}, {mob.y}, 0])\n"
-            if mob.scale != 1.0:
-                line += f"        {var_name}.scale({mob.scale})\n"
-            script += line
-            
-        script += "\n"
-        for anim in self.animations:
-            if anim.target_id in var_map:
-                target = var_map[anim.target_id]
-                if anim.anim_type == "Transform" and anim.replacement_id in var_map:
-                    replacement = var_map[anim.replacement_id]
-                    script += f"        self.play(Transform({target}, {replacement}), run_time={anim.duration})\n"
-                elif anim.anim_type != "Transform":
-                    script += f"        self.play({anim.anim_type}({target}), run_time={anim.duration})\n"
-                    
-        script += "        self.wait(1)\n"
-        return script
-
-    def render_video(self) -> None:
+    def check_renderable(self) -> bool:
         error_objects = []
         for mob_id, item in self.canvas.items_map.items():
             if item.has_render_error:
@@ -2181,60 +4055,94 @@ QWidget#ZoomBar { background-color: #f3f3f3; border-top: 1px solid #e0e0e0; }
             msg = "以下对象存在 LaTeX 语法错误，无法进行渲染：\n\n" + "\n".join(f"- {name}" for name in error_objects)
             msg += "\n\n请修改公式内容后再试。"
             QMessageBox.warning(self, "渲染无法开始", msg)
-            return
+            return False
 
         if not self.animations:
             QMessageBox.warning(self, "渲染无法开始", "当前没有添加任何动画。\n请在右侧侧边栏添加动画后再进行渲染。")
-            return
+            return False
+        return True
+
+    def render_video(self) -> None:
+        if not self.check_renderable(): return
 
-        self.render_progress_bar.setVisible(True)
-        self.render_progress_bar.setRange(0, 0)
-        self.set_ui_locked(True)
-        self.console_output.clear()
-        self.console_output.append("启动渲染...")
-        
         script_content = self.generate_script()
-        
-        if not os.path.exists("temp_assets"): os.makedirs("temp_assets")
-        
-        script_file = "temp_assets/final_scene.py"
-        try:
-            with open(script_file, "w", encoding="utf-8") as f:
-                f.write(script_content)
-        except Exception as e:
-            self.console_output.append(f"写入脚本失败：{e}")
-            self.set_ui_locked(False)
-            return
+        fingerprint = ScriptGenerator.fingerprint(script_content, self.input_scene_name.text().strip(), self.quality_combo.currentText(), self.frame_rate_combo.currentText())
+        if fingerprint == self.last_render_fingerprint:
+            reply = QMessageBox.question(self, "场景未变化", "场景和渲染参数与上次成功渲染时相同，是否仍要重新渲染？")
+            if reply != QMessageBox.StandardButton.Yes: return
         
         raw_name = self.input_scene_name.text().strip()
         if not raw_name: raw_name = "MyScene"
         scene_class_name = raw_name.replace(' ', '_') 
         
-        quality_flag = QUALITY_MAP[self.quality_combo.currentText()]
+        quality = self.quality_combo.currentText()
         frame_rate = self.frame_rate_combo.currentText()
 
-        command = f"-m manim -p --resolution {quality_flag} --fps {frame_rate} -o {raw_name} {script_file} {scene_class_name}"
-        
-        self.process = QProcess()
-        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
-        self.process.readyReadStandardOutput.connect(self.handle_output)
-        self.process.finished.connect(self.render_finished)
-
-        self.console_output.append(f"Manim> {command}\n")
-        self.process.start(sys.executable, command.split(" "))
-
-    def handle_output(self) -> None:
-        data = self.process.readAllStandardOutput()
-        text = bytes(data).decode("utf-8", errors="replace")
-        self.console_output.insertPlainText(text)
-        self.console_output.ensureCursorVisible()
+        mob_snapshots, anim_snapshots = self.capture_state()
+        workers = int(self.render_jobs_combo.currentText())
+        plan = SectionRenderPlan(self.script_generator, scene_class_name, raw_name, mob_snapshots, anim_snapshots,
+                                 QUALITY_MAP[quality], frame_rate, workers)
+        job = RenderJob(f"{raw_name} [{quality.split()[0]} {frame_rate}fps]", plan, preview=True, fingerprint=fingerprint)
+        self.enqueue_render_job(job)
+        self.bottom_tabs.setCurrentWidget(self.render_queue_panel)
+
+    def batch_render(self) -> None:
+        dialog = BatchRenderDialog(self, self.frame_rate_combo.currentText())
+        if not dialog.exec(): return
+        data = dialog.get_data()
+        if not data["qualities"]:
+            QMessageBox.warning(self, "批量渲染", "请至少选择一种画质。")
+            return
 
-    def render_finished(self, exit_code: int, exit_status: QProcess.ExitStatus) -> None:
-        self.set_ui_locked(False)
-        self.render_progress_bar.setVisible(False)
+        sources: List[Tuple[str, str, SceneState]] = [] # (名称, 场景类名, 快照)
+        if data["include_current"]:
+            if not self.check_renderable(): return
+            raw_name = self.input_scene_name.text().strip() or "MyScene"
+            sources.append((raw_name, raw_name.replace(' ', '_'), self.capture_state()))
+        for path in data["files"]:
+            try:
+                reader = ProjectReader(path)
+                state = (tuple(reader.iter_snapshots("mobjects", MobjectData)), tuple(reader.iter_snapshots("animations", AnimationData)))
+            except Exception as e:
+                self.console_output.append(f"无法读取项目 {path}: {str(e)}")
+                continue
+            if not state[1]:
+                self.console_output.append(f"项目 {path} 没有动画，已跳过")
+                continue
+            name = os.path.splitext(os.path.basename(path))[0]
+            sources.append((name, re.sub(r"\W|^(?=\d)", "_", name), state))
+
+        frame_rate = data["frame_rate"]
+        workers = int(self.render_jobs_combo.currentText())
+        for name, class_name, (mob_snapshots, anim_snapshots) in sources:
+            for quality in data["qualities"]:
+                label = quality.split()[0]
+                plan = SectionRenderPlan(self.script_generator, class_name, f"{name}_{label}_{frame_rate}fps", mob_snapshots, anim_snapshots,
+                                         QUALITY_MAP[quality], frame_rate, workers)
+                self.enqueue_render_job(RenderJob(f"{name} [{label} {frame_rate}fps]", plan))
+        if sources:
+            self.bottom_tabs.setCurrentWidget(self.render_queue_panel)
+
+    def enqueue_render_job(self, job: RenderJob) -> None:
+        self.render_progress_bar.setVisible(True)
+        self.render_progress_bar.setRange(0, 0)
+        self.console_output.append(f"已加入渲染队列：{job.title}")
+        self.render_queue.enqueue(job)
+
+    def on_render_job_finished(self, job: RenderJob) -> None:
+        if job.status == "done":
+            output_path = os.path.abspath(job.plan.output_path)
+            self.console_output.append(f"渲染完成：{job.title} -> {output_path}")
+            if job.fingerprint: self.last_render_fingerprint = job.fingerprint
+            if job.preview: QDesktopServices.openUrl(QUrl.fromLocalFile(output_path))
+        else:
+            self.console_output.append(f"渲染{RENDER_JOB_STATUS_TEXT[job.status]}：{job.title}")
+        if not self.render_queue.active_jobs():
+            self.render_progress_bar.setVisible(False)
 
 def register_user_association(ext, type_name, icon_path):
     """辅助函数：为当前用户设置文件关联"""
+    if sys.platform != "win32": return # 注册表仅存在于 Windows
     try:
         python_exe = sys.executable.replace("python.exe", "pythonw.exe")
         script_path = os.path.abspath(__file__)
@@ -2265,17 +4173,25 @@ def register_user_association(ext, type_name, icon_path):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
-    
-    # 尝试设置文件关联（每次启动都检查一下，确保关联存在）
-    register_user_association(FILE_EXTENSION, "Manim.Project", findfile(FILE_ICON))
 
     window = ManimEditor()
     window.showMaximized()
+    QTimer.singleShot(0, window.report_startup_time)
+    # 窗口显示后再清理缓存、设置文件关联，避免拖慢首屏；编译子进程在首次编译时才启动
+    QTimer.singleShot(1000, TEX_DISK_CACHE.evict)
+    QTimer.singleShot(1000, SEGMENT_CACHE.evict)
+    QTimer.singleShot(1000, sweep_render_work_dirs)
+    # 尝试设置文件关联（每次启动都检查一下，确保关联存在）
+    QTimer.singleShot(1000, lambda: register_user_association(FILE_EXTENSION, "Manim.Project", findfile(FILE_ICON)))
 
-    # 检查是否有启动参数（双击文件会传入文件路径）
+    # 先询问是否恢复未命名项目的自动保存 (可能是上次异常退出时唯一的副本)，再处理启动参数（双击文件会传入文件路径）
+    recovered = window.check_autosave_recovery()
     if len(sys.argv) > 1:
         file_to_open = sys.argv[1]
         if file_to_open.endswith(FILE_EXTENSION):
-            window.load_project_from_file(file_to_open)
+            if recovered:
+                window.console_output.append(f"已恢复未命名项目，未打开 {file_to_open}，请先保存恢复的内容")
+            else:
+                window.load_project_from_file(file_to_open)
 
     sys.exit(app.exec())
\ No newline at end of file
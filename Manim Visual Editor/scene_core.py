@@ -0,0 +1,646 @@
+"""Manim Visual Editor 的无界面核心：数据类、项目文件读写、脚本生成与分段渲染计划，以及命令行渲染入口
+
+只依赖标准库，供编辑器与无图形界面的渲染节点共用。
+"""
+import sys
+import os
+import re
+import time
+import json
+import hashlib
+import subprocess
+import shutil
+import glob
+import struct
+import zlib
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Optional, List, Tuple, Dict, Any, Callable, Iterator
+
+# === 配置 ===
+CURRENT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+RENDER_SHARD_WORKERS: int = os.cpu_count() or 4 # 分段渲染时同时运行的 manim 进程数默认值
+
+QUALITY_MAP = {
+    "480p (854*480)": "854,480",
+    "720p (1280*720)": "1280,720",
+    "1080p (1920*1080)": "1920,1080",
+    "4K (3840*2160)": "3840,2160"
+}
+
+PROJECT_MAGIC = b"\x89MVE\r\n\x1a\n" # 二进制项目文件魔数，旧版 JSON 项目以 "{" 开头，据此区分
+PROJECT_HEADER = struct.Struct("<8sHI") # 魔数, 格式版本, 目录表长度
+PROJECT_FORMAT_VERSION = 1
+PROJECT_CHUNK_SIZE = 4096 # 每个压缩块包含的对象数，读取时逐块解压
+PROJECT_COMPRESS_LEVEL = 6
+SEGMENT_CACHE_DIR = os.path.join(CURRENT_DIR, "segment_cache")
+SEGMENT_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+# 渲染任务的工作目录与输出目录不依赖当前目录 (经文件关联启动时当前目录可能是任意甚至只读的位置)
+RENDER_JOBS_DIR = os.path.join(tempfile.gettempdir(), "manim_visual_editor", "jobs") # 每个渲染任务独立的临时目录，完成后删除
+RENDER_JOBS_MAX_AGE_SECONDS = 24 * 3600 # 超过该时间的任务目录视为异常退出的遗留，启动时清理
+RENDER_OUTPUT_DIR = os.path.join(CURRENT_DIR, "render_output")
+
+# === 数据类 ===
+class SnapshotMixin:
+    """为可变数据类缓存一个不可变快照 (字段值元组)，字段未修改时重复使用同一快照，供撤销历史结构共享"""
+    __slots__ = ("_snapshot",)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_snapshot", None) is not None and name != "_snapshot" and getattr(self, name) != value:
+            object.__setattr__(self, "_snapshot", None)
+        object.__setattr__(self, name, value)
+
+    def snapshot(self) -> tuple:
+        snap = getattr(self, "_snapshot", None)
+        if snap is None:
+            snap = tuple(getattr(self, f.name) for f in fields(self))
+            object.__setattr__(self, "_snapshot", snap)
+        return snap
+
+    @classmethod
+    def from_snapshot(cls, snap: tuple):
+        obj = cls(*snap)
+        object.__setattr__(obj, "_snapshot", snap)
+        return obj
+
+# slots: 去掉每个实例的 __dict__，大场景下显著降低内存占用
+@dataclass(slots=True)
+class MobjectData(SnapshotMixin):
+    id: str
+    name: str
+    mob_type: str 
+    color: str
+    content: str = "" 
+    font: str = "Arial" 
+    x: float = 0.0
+    y: float = 0.0
+    scale: float = 1.0
+    visible: bool = True 
+
+@dataclass(slots=True)
+class AnimationData(SnapshotMixin):
+    id: str
+    anim_type: str 
+    target_id: str
+    target_name_snapshot: str 
+    replacement_id: Optional[str] = None 
+    replacement_name_snapshot: Optional[str] = None
+    duration: float = 1.0 
+
+# 快照元组中各字段的位置
+MOBJECT_FIELD_INDEX: Dict[str, int] = {f.name: i for i, f in enumerate(fields(MobjectData))}
+ANIMATION_FIELD_INDEX: Dict[str, int] = {f.name: i for i, f in enumerate(fields(AnimationData))}
+
+# 撤销历史中的场景状态: (对象快照元组, 动画快照元组)，未修改的对象在各状态间共享同一快照
+SceneState = Tuple[Tuple[tuple, ...], Tuple[tuple, ...]]
+
+# === 项目文件读写 ===
+class ProjectReader:
+    """读取 .manim 项目：二进制格式按目录表逐块解压，按需产出快照元组；旧版 JSON 文件整体解析后同样按快照产出"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.toc: Dict[str, Any] = {}
+        self._json: Optional[dict] = None
+        with open(path, 'rb') as f:
+            head = f.read(PROJECT_HEADER.size)
+            self.is_binary = head[:len(PROJECT_MAGIC)] == PROJECT_MAGIC
+            if self.is_binary:
+                if len(head) < PROJECT_HEADER.size:
+                    raise ValueError("项目文件头不完整")
+                _, version, toc_length = PROJECT_HEADER.unpack(head)
+                if version > PROJECT_FORMAT_VERSION:
+                    raise ValueError(f"不支持的项目文件版本: {version}")
+                self.toc = json.loads(f.read(toc_length).decode("utf-8"))
+
+    def _load_json(self) -> dict:
+        if self._json is None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._json = json.load(f)
+        return self._json
+
+    def iter_snapshots(self, section: str, cls: type) -> Iterator[tuple]:
+        names = [f.name for f in fields(cls)]
+        if not self.is_binary:
+            for d in self._load_json().get(section, []):
+                yield cls(**d).snapshot()
+            return
+        stored = self.toc["fields"].get(section, names)
+        with open(self.path, 'rb') as f:
+            for chunk in self.toc["sections"].get(section, []):
+                f.seek(chunk["offset"])
+                rows = json.loads(zlib.decompress(f.read(chunk["length"])).decode("utf-8"))
+                if stored == names:
+                    # 字段一致时行本身就是快照，无需经过字典
+                    for row in rows:
+                        yield tuple(row)
+                else:
+                    for row in rows:
+                        yield cls(**{k: v for k, v in zip(stored, row) if k in names}).snapshot()
+
+def diff_scene_states(old: Tuple[Tuple[tuple, ...], Tuple[tuple, ...]], new: Tuple[Tuple[tuple, ...], Tuple[tuple, ...]]) -> Optional[Dict[str, Any]]:
+    """计算两个场景状态之间的增量记录 (新增/修改的快照行、删除的 id、顺序变化时的完整 id 序列)，无变化时返回 None"""
+    record: Dict[str, Any] = {}
+    for section, old_snaps, new_snaps in (("mobjects", old[0], new[0]), ("animations", old[1], new[1])):
+        old_map = {s[0]: s for s in old_snaps}
+        new_ids = [s[0] for s in new_snaps]
+        upsert = [s for s in new_snaps if old_map.get(s[0]) is not s and old_map.get(s[0]) != s]
+        new_id_set = set(new_ids)
+        remove = [sid for sid in old_map if sid not in new_id_set]
+        entry: Dict[str, Any] = {}
+        if upsert: entry["upsert"] = upsert
+        if remove: entry["remove"] = remove
+        if new_ids != [s[0] for s in old_snaps]: entry["order"] = new_ids
+        if entry: record[section] = entry
+    return record or None
+
+def apply_scene_diff(state: Tuple[Tuple[tuple, ...], Tuple[tuple, ...]], record: Dict[str, Any]) -> Tuple[Tuple[tuple, ...], Tuple[tuple, ...]]:
+    result = []
+    for section, snaps in (("mobjects", state[0]), ("animations", state[1])):
+        entry = record.get(section)
+        if not entry:
+            result.append(snaps)
+            continue
+        by_id = {s[0]: s for s in snaps}
+        order = [s[0] for s in snaps]
+        for sid in entry.get("remove", []):
+            by_id.pop(sid, None)
+        for row in entry.get("upsert", []):
+            if row[0] not in by_id: order.append(row[0])
+            by_id[row[0]] = tuple(row)
+        order = entry.get("order", order)
+        result.append(tuple(by_id[sid] for sid in order if sid in by_id))
+    return result[0], result[1]
+
+def replay_journal(state: SceneState, journal_path: str) -> SceneState:
+    # 按顺序应用自动保存日志中的增量记录；日志不存在时原样返回
+    try:
+        f = open(journal_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return state
+    with f:
+        for line in f:
+            try:
+                state = apply_scene_diff(state, json.loads(line))
+            except ValueError:
+                break # 崩溃时写了一半的最后一行
+    return state
+
+def write_file_atomic(path: str, write: Callable[[Any], None], binary: bool) -> None:
+    # 先写临时文件并落盘，再原子替换目标文件，写入中途崩溃不会损坏原文件
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb' if binary else 'w', **({} if binary else {"encoding": "utf-8"})) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def write_project_file(path: str, mob_snapshots: Tuple[tuple, ...], anim_snapshots: Tuple[tuple, ...], binary: bool = True) -> None:
+    if not binary:
+        names = {"mobjects": [f.name for f in fields(MobjectData)], "animations": [f.name for f in fields(AnimationData)]}
+        data = {
+            "mobjects": [dict(zip(names["mobjects"], s)) for s in mob_snapshots],
+            "animations": [dict(zip(names["animations"], s)) for s in anim_snapshots]
+        }
+        write_file_atomic(path, lambda f: json.dump(data, f, indent=4, ensure_ascii=False), binary=False)
+        return
+
+    # 文件布局: 文件头 (魔数, 版本, 目录表长度) | 目录表 (JSON) | 各分块 (zlib 压缩的行数组 JSON)
+    sections: Dict[str, List[Dict[str, int]]] = {}
+    blobs: List[bytes] = []
+    for section, snapshots in (("mobjects", mob_snapshots), ("animations", anim_snapshots)):
+        sections[section] = []
+        for start in range(0, len(snapshots), PROJECT_CHUNK_SIZE):
+            rows = snapshots[start:start + PROJECT_CHUNK_SIZE]
+            blob = zlib.compress(json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode("utf-8"), PROJECT_COMPRESS_LEVEL)
+            sections[section].append({"offset": 0, "length": len(blob), "count": len(rows)})
+            blobs.append(blob)
+    toc = {
+        "fields": {"mobjects": [f.name for f in fields(MobjectData)], "animations": [f.name for f in fields(AnimationData)]},
+        "sections": sections
+    }
+    # 偏移依赖目录表自身长度，偏移值位数变化时重新计算直到稳定
+    toc_bytes = b""
+    while True:
+        offset = PROJECT_HEADER.size + len(toc_bytes)
+        for chunk in (c for section in sections.values() for c in section):
+            chunk["offset"] = offset
+            offset += chunk["length"]
+        new_toc_bytes = json.dumps(toc, separators=(',', ':')).encode("utf-8")
+        stable = len(new_toc_bytes) == len(toc_bytes)
+        toc_bytes = new_toc_bytes
+        if stable: break
+
+    def write(f) -> None:
+        f.write(PROJECT_HEADER.pack(PROJECT_MAGIC, PROJECT_FORMAT_VERSION, len(toc_bytes)))
+        f.write(toc_bytes)
+        for blob in blobs:
+            f.write(blob)
+    write_file_atomic(path, write, binary=True)
+
+# === 脚本生成 ===
+class ScriptGenerator:
+    """生成 Manim 场景脚本：每个对象/动画的代码片段按其快照缓存，只有变化的条目才重新生成，最后一次性拼接"""
+
+    def __init__(self, max_entries: int = 16384) -> None:
+        self.max_entries = max_entries
+        self._fragments: Dict[tuple, str] = {}
+        self.last_fingerprint: Optional[str] = None
+
+    def _cached(self, key: tuple, build: Callable[[], str]) -> str:
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            if len(self._fragments) >= self.max_entries:
+                self._fragments.clear()
+            fragment = self._fragments[key] = build()
+        return fragment
+
+    @staticmethod
+    def mobject_code(var_name: str, snap: tuple) -> str:
+        f = MOBJECT_FIELD_INDEX
+        mob_type, color, content, font = snap[f["mob_type"]], snap[f["color"]], snap[f["content"]], snap[f["font"]]
+        if mob_type == "Square":
+            code = f"Square(side_length=2, color='{color}', fill_opacity=0.5)"
+        elif mob_type == "Circle":
+            code = f"Circle(radius=1, color='{color}', fill_opacity=0.5)"
+        elif mob_type == "Text":
+            code = f"Text('{content}', color='{color}', font='{font}')"
+        elif mob_type == "MathTex":
+            code = f"MathTex(r'{content}', color='{color}')"
+        else:
+            code = "Square()"
+
+        line = f"        {var_name} = {code}\n"
+        line += f"        {var_name}.move_to([{snap[f['x']]}, {snap[f['y']]}, 0])\n"
+        if snap[f["scale"]] != 1.0:
+            line += f"        {var_name}.scale({snap[f['scale']]})\n"
+        return line
+
+    @staticmethod
+    def animation_code(snap: tuple, target: Optional[str], replacement: Optional[str]) -> str:
+        f = ANIMATION_FIELD_INDEX
+        anim_type, duration = snap[f["anim_type"]], snap[f["duration"]]
+        if target is None: return ""
+        if anim_type == "Transform":
+            if replacement is None: return ""
+            return f"        self.play(Transform({target}, {replacement}), run_time={duration})\n"
+        return f"        self.play({anim_type}({target}), run_time={duration})\n"
+
+    def generate(self, class_name: str, mob_snapshots: Tuple[tuple, ...], anim_snapshots: Tuple[tuple, ...]) -> str:
+        parts = ["from manim import *\n", f"class {class_name}(Scene):\n", "    def construct(self):\n"]
+        var_map: Dict[str, str] = {}
+        for i, snap in enumerate(mob_snapshots):
+            var_name = f"m{i}"
+            var_map[snap[0]] = var_name
+            parts.append(self._cached(("mob", var_name, snap), lambda: self.mobject_code(var_name, snap)))
+        parts.append("\n")
+        f = ANIMATION_FIELD_INDEX
+        for snap in anim_snapshots:
+            target = var_map.get(snap[f["target_id"]])
+            replacement = var_map.get(snap[f["replacement_id"]])
+            parts.append(self._cached(("anim", target, replacement, snap), lambda: self.animation_code(snap, target, replacement)))
+        parts.append("        self.wait(1)\n")
+        script = "".join(parts)
+        self.last_fingerprint = self.fingerprint(script)
+        return script
+
+    def generate_sections(self, class_name: str, mob_snapshots: Tuple[tuple, ...], anim_snapshots: Tuple[tuple, ...],
+                          settings: tuple, skip_section: Callable[[str], bool], stop_after: Optional[str] = None) -> Tuple[str, List[str], List[float]]:
+        # 每个动画 (以及结尾的等待) 一个 section，section 名为其键：到该片段为止的全部代码与渲染参数的链式哈希
+        # 返回脚本、各 section 的键与时长；stop_after 指定时脚本在该 section 之后结束
+        parts = ["from manim import *\n", f"class {class_name}(Scene):\n", "    def construct(self):\n"]
+        var_map: Dict[str, str] = {}
+        for i, snap in enumerate(mob_snapshots):
+            var_name = f"m{i}"
+            var_map[snap[0]] = var_name
+            parts.append(self._cached(("mob", var_name, snap), lambda: self.mobject_code(var_name, snap)))
+        parts.append("\n")
+        chain = hashlib.sha256("".join(parts).encode("utf-8"))
+        for value in settings:
+            chain.update(b"\0" + str(value).encode("utf-8"))
+        f = ANIMATION_FIELD_INDEX
+        codes = []
+        for snap in anim_snapshots:
+            target = var_map.get(snap[f["target_id"]])
+            replacement = var_map.get(snap[f["replacement_id"]])
+            code = self._cached(("anim", target, replacement, snap), lambda: self.animation_code(snap, target, replacement))
+            if code: codes.append((code, float(snap[f["duration"]])))
+        codes.append(("        self.wait(1)\n", 1.0))
+        keys, durations = [], []
+        emitting = True
+        for code, duration in codes:
+            chain.update(code.encode("utf-8"))
+            key = chain.hexdigest()[:24]
+            keys.append(key)
+            durations.append(duration)
+            if emitting:
+                parts.append(f"        self.next_section('{key}', skip_animations={skip_section(key)})\n")
+                parts.append(code)
+                emitting = key != stop_after
+        return "".join(parts), keys, durations
+
+    @staticmethod
+    def fingerprint(script: str, *settings: Any) -> str:
+        # 同一脚本与渲染参数得到相同指纹，可据此跳过重复渲染
+        h = hashlib.sha256(script.encode("utf-8"))
+        for value in settings:
+            h.update(b"\0" + str(value).encode("utf-8"))
+        return h.hexdigest()
+
+# === 分段渲染 ===
+class SegmentCache:
+    """已渲染片段视频的磁盘缓存，文件名即片段键 (场景到该片段为止的状态与渲染参数的哈希)，按最近使用时间淘汰"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = SEGMENT_CACHE_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp4")
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def touch(self, key: str) -> None:
+        try: os.utime(self.path(key))
+        except OSError: pass
+
+    def store(self, key: str, video_path: str) -> None:
+        # 临时文件名每次唯一：同一场景的多个任务可能同时渲染出同一片段
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{key}.", suffix=".tmp", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            shutil.copyfile(video_path, tmp_path)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            raise
+
+    def evict(self) -> int:
+        try:
+            with os.scandir(self.cache_dir) as it:
+                files = [(f.stat().st_mtime, f.stat().st_size, f.path) for f in it if f.is_file()]
+        except OSError:
+            return 0
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes: break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+SEGMENT_CACHE = SegmentCache(SEGMENT_CACHE_DIR)
+
+def new_render_work_dir() -> str:
+    os.makedirs(RENDER_JOBS_DIR, exist_ok=True)
+    return tempfile.mkdtemp(prefix="job-", dir=RENDER_JOBS_DIR)
+
+def sweep_render_work_dirs(max_age_seconds: float = RENDER_JOBS_MAX_AGE_SECONDS) -> int:
+    # 只删除足够旧的目录，不影响同时运行的其他编辑器或命令行渲染的任务
+    now = time.time()
+    try:
+        with os.scandir(RENDER_JOBS_DIR) as it:
+            stale = [entry.path for entry in it if entry.is_dir() and now - entry.stat().st_mtime > max_age_seconds]
+    except OSError:
+        return 0
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+    return len(stale)
+
+class SectionRenderPlan:
+    """一次渲染的执行计划，按阶段给出可并行运行的命令：
+
+    可分段时 (找到 ffmpeg) 每个动画生成一个 Manim section，缓存中已有的片段以 skip_animations 跳过；
+    待渲染的片段按时长切成若干分片，每个分片是一个独立的 manim 进程 (跳过式重放到分片起点，渲染到分片终点为止)，
+    新片段存入缓存后用 ffmpeg concat 无损拼接。找不到 ffmpeg 时退回整段渲染。
+    最终视频先写到输出目录中本计划独有的临时文件，完成后原子替换为 output_dir 下的 <output_name>.mp4。
+    """
+
+    def __init__(self, generator: "ScriptGenerator", class_name: str, output_name: str,
+                 mob_snapshots: Tuple[tuple, ...], anim_snapshots: Tuple[tuple, ...],
+                 resolution: str, frame_rate: str, workers: int = 1, work_dir: Optional[str] = None,
+                 output_dir: str = RENDER_OUTPUT_DIR) -> None:
+        self.class_name = class_name
+        self.output_name = output_name
+        self.resolution = resolution
+        self.frame_rate = frame_rate
+        self.workers = max(1, workers)
+        self.work_dir = work_dir if work_dir is not None else new_render_work_dir()
+        self.ffmpeg = shutil.which("ffmpeg")
+        self.sectioned = self.ffmpeg is not None
+        if self.sectioned:
+            settings = (resolution, frame_rate)
+            _, self.section_keys, durations = generator.generate_sections(class_name, mob_snapshots, anim_snapshots, settings, SEGMENT_CACHE.contains)
+            pending = [(k, d) for k, d in zip(self.section_keys, durations) if not SEGMENT_CACHE.contains(k)]
+            self.pending_keys = [k for k, _ in pending]
+            self.shards = self.split_shards(pending, self.workers)
+            self.scripts = []
+            for shard in self.shards:
+                keys = set(shard)
+                script, _, _ = generator.generate_sections(class_name, mob_snapshots, anim_snapshots, settings,
+                                                          lambda k, keys=keys: k not in keys, stop_after=shard[-1])
+                self.scripts.append(script)
+        else:
+            self.section_keys, self.pending_keys, self.shards = [], [], [[]]
+            self.scripts = [generator.generate(class_name, mob_snapshots, anim_snapshots)]
+        self.output_path = os.path.join(output_dir, f"{output_name}.mp4")
+        # 与最终文件同目录 (同一文件系统) 才能原子替换；以工作目录名区分，同名任务互不干扰
+        self.partial_path = os.path.join(output_dir, f".{output_name}.{os.path.basename(self.work_dir)}.mp4")
+        self.stage = "manim" if (self.pending_keys or not self.sectioned) else "concat"
+
+    @staticmethod
+    def split_shards(pending: List[Tuple[str, float]], count: int) -> List[List[str]]:
+        # 按时间顺序切成至多 count 个连续分片，使各分片的动画总时长接近
+        count = max(1, min(count, len(pending)))
+        if not pending: return []
+        boundary = sum(d for _, d in pending) / count
+        shards: List[List[str]] = [[]]
+        elapsed = 0.0
+        for key, duration in pending:
+            if shards[-1] and len(shards) < count and elapsed + duration / 2 > boundary * len(shards):
+                shards.append([])
+            shards[-1].append(key)
+            elapsed += duration
+        return shards
+
+    def shard_dir(self, index: int) -> str:
+        return self.work_dir if len(self.scripts) == 1 else os.path.join(self.work_dir, "shards", f"shard_{index}")
+
+    def script_file(self, index: int) -> str:
+        return os.path.join(self.shard_dir(index), "final_scene.py")
+
+    def write_script(self) -> None:
+        for i, script in enumerate(self.scripts):
+            os.makedirs(self.shard_dir(i), exist_ok=True)
+            with open(self.script_file(i), "w", encoding="utf-8") as f:
+                f.write(script)
+
+    def commands(self) -> List[Tuple[str, List[str]]]:
+        # 当前阶段的全部命令 (程序, 参数)，同一阶段内的命令互不依赖；全部完成时返回空列表
+        if self.stage == "manim":
+            if not self.sectioned:
+                return [(sys.executable, ["-m", "manim", "--resolution", self.resolution, "--fps", self.frame_rate,
+                                          "--media_dir", os.path.join(self.work_dir, "media"),
+                                          "-o", self.output_name, self.script_file(0), self.class_name])]
+            return [(sys.executable, ["-m", "manim", "--resolution", self.resolution, "--fps", self.frame_rate,
+                                      "--save_sections", "--media_dir", os.path.join(self.shard_dir(i), "media"),
+                                      "-o", self.class_name, self.script_file(i), self.class_name])
+                    for i in range(len(self.shards))]
+        if self.stage == "concat":
+            list_file = os.path.join(self.work_dir, "segments.txt")
+            with open(list_file, "w", encoding="utf-8") as f:
+                for key in self.section_keys:
+                    SEGMENT_CACHE.touch(key)
+                    f.write("file '{}'\n".format(os.path.abspath(SEGMENT_CACHE.path(key)).replace("\\", "/").replace("'", "'\\''")))
+            os.makedirs(os.path.dirname(self.partial_path), exist_ok=True)
+            return [(self.ffmpeg, ["-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", self.partial_path])]
+        return []
+
+    def stage_finished(self) -> None:
+        if self.stage == "manim":
+            if self.sectioned:
+                for i, shard in enumerate(self.shards):
+                    self.collect_sections(os.path.join(self.shard_dir(i), "media"), shard)
+            else:
+                self.collect_output()
+            self.stage = "concat" if self.sectioned else "done"
+        elif self.stage == "concat":
+            os.replace(self.partial_path, self.output_path)
+            self.stage = "done"
+
+    def collect_output(self) -> None:
+        # 整段渲染的结果在 media 目录中，按文件名取出复制到输出位置
+        videos = glob.glob(os.path.join(self.work_dir, "media", "videos", "**", f"{glob.escape(self.output_name)}.mp4"), recursive=True)
+        if not videos:
+            raise RuntimeError("未找到渲染输出")
+        os.makedirs(os.path.dirname(self.partial_path), exist_ok=True)
+        shutil.copyfile(max(videos, key=os.path.getmtime), self.partial_path)
+        os.replace(self.partial_path, self.output_path)
+
+    def collect_sections(self, media_dir: str, keys: List[str]) -> None:
+        # 从分片输出的 section 索引中取出新渲染的片段存入缓存
+        indexes = glob.glob(os.path.join(media_dir, "videos", "**", "sections", f"{self.class_name}.json"), recursive=True)
+        if not indexes:
+            raise RuntimeError("未找到分段渲染输出")
+        index_path = max(indexes, key=os.path.getmtime)
+        with open(index_path, "r", encoding="utf-8") as f:
+            sections = json.load(f)
+        for section in sections:
+            if section.get("name") in keys:
+                SEGMENT_CACHE.store(section["name"], os.path.join(os.path.dirname(index_path), section["video"]))
+        missing = [k for k in keys if not SEGMENT_CACHE.contains(k)]
+        if missing:
+            raise RuntimeError(f"{len(missing)} 个片段未生成")
+
+    def cleanup(self) -> None:
+        # 结束后 (无论成败) 删除工作目录与未完成的输出：新片段已进入缓存，成功时输出已替换到位
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        try: os.remove(self.partial_path)
+        except OSError: pass
+
+# === 命令行渲染 ===
+def parse_quality(value: str) -> Tuple[str, str]:
+    # 接受画质预设名或其简称 (如 "1080p")，也接受 "宽,高"；返回 (标签, manim 分辨率参数)
+    for name, resolution in QUALITY_MAP.items():
+        if value.lower() in (name.lower(), name.split()[0].lower()):
+            return name.split()[0], resolution
+    if re.fullmatch(r"\d+[,x]\d+", value):
+        return value.replace(",", "x"), value.replace("x", ",")
+    raise argparse.ArgumentTypeError(f"未知画质: {value} (可选: {', '.join(n.split()[0] for n in QUALITY_MAP)}，或 宽,高)")
+
+def run_command(program: str, args: List[str]) -> Tuple[int, str]:
+    result = subprocess.run([program] + args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    return result.returncode, result.stdout.decode("utf-8", errors="replace")
+
+def run_render_plan(plan: SectionRenderPlan, executor: ThreadPoolExecutor, title: str, verbose: bool = False) -> bool:
+    """在命令行中依次执行渲染计划的各阶段，同一阶段的命令提交给共享的进程池并行运行；结束后无论成败都删除计划的工作目录"""
+    def log(message: str) -> None:
+        print(f"[{title}] {message}", file=sys.stderr, flush=True)
+
+    if plan.sectioned:
+        total = len(plan.section_keys)
+        log(f"共 {total} 段，其中 {total - len(plan.pending_keys)} 段使用缓存，其余分为 {len(plan.shards)} 个分片")
+    else:
+        log("未找到 ffmpeg，渲染完整场景")
+    try:
+        plan.write_script()
+        while True:
+            commands = plan.commands()
+            if not commands: break
+            log(f"{plan.stage}: {len(commands)} 个进程")
+            results = list(executor.map(lambda command: run_command(*command), commands))
+            failed = [(code, output) for code, output in results if code != 0]
+            if verbose or failed:
+                for _, output in results:
+                    sys.stderr.write(output)
+            if failed:
+                log(f"渲染失败：进程退出码 {failed[0][0]}")
+                return False
+            plan.stage_finished()
+    except Exception as e:
+        log(f"渲染失败：{e}")
+        return False
+    finally:
+        plan.cleanup()
+    log(f"完成：{os.path.abspath(plan.output_path)}")
+    return True
+
+def cli_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="main.py render", description="不启动编辑器界面，直接渲染 .manim 项目")
+    parser.add_argument("projects", nargs="+", help="要渲染的项目文件")
+    parser.add_argument("--quality", type=parse_quality, action="append", help="画质，可重复指定以渲染多种画质 (默认 1080p)")
+    parser.add_argument("--fps", default="60", help="帧率 (默认 60)")
+    parser.add_argument("--jobs", type=int, default=RENDER_SHARD_WORKERS, help=f"同时运行的渲染进程数 (默认 {RENDER_SHARD_WORKERS})")
+    parser.add_argument("--output-dir", default=RENDER_OUTPUT_DIR, help="输出目录")
+    parser.add_argument("--scene", help="场景类名 (默认取项目文件名)")
+    parser.add_argument("--verbose", action="store_true", help="输出 manim/ffmpeg 的全部日志")
+    args = parser.parse_args(argv)
+    qualities = list(dict.fromkeys(args.quality or [parse_quality("1080p")]))
+    jobs = max(1, args.jobs)
+
+    projects: List[Tuple[str, Tuple[tuple, ...], Tuple[tuple, ...]]] = []
+    for path in args.projects:
+        try:
+            reader = ProjectReader(path)
+            mob_snapshots = tuple(reader.iter_snapshots("mobjects", MobjectData))
+            anim_snapshots = tuple(reader.iter_snapshots("animations", AnimationData))
+        except Exception as e:
+            print(f"无法读取项目 {path}: {e}", file=sys.stderr)
+            return 1
+        if not anim_snapshots:
+            print(f"项目 {path} 没有动画，已跳过", file=sys.stderr)
+            continue
+        projects.append((path, mob_snapshots, anim_snapshots))
+    names = [os.path.splitext(os.path.basename(path))[0] for path, _, _ in projects]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        print(f"以下项目同名，输出文件会互相覆盖: {', '.join(duplicates)}", file=sys.stderr)
+        return 1
+
+    # 全部项目读取成功后才建立计划 (建立计划即创建其工作目录)
+    generator = ScriptGenerator()
+    plans: List[Tuple[str, SectionRenderPlan]] = []
+    for path, mob_snapshots, anim_snapshots in projects:
+        name = os.path.splitext(os.path.basename(path))[0]
+        class_name = args.scene or re.sub(r"\W|^(?=\d)", "_", name)
+        for label, resolution in qualities:
+            output_name = name if len(qualities) == 1 else f"{name}_{label}"
+            plan = SectionRenderPlan(generator, class_name, output_name, mob_snapshots, anim_snapshots,
+                                     resolution, args.fps, jobs, output_dir=args.output_dir)
+            plans.append((f"{name} {label}", plan))
+    if not plans: return 1
+
+    # 所有项目共享同一组渲染进程名额，各项目的阶段推进互不等待
+    with ThreadPoolExecutor(max_workers=jobs) as executor, ThreadPoolExecutor(max_workers=len(plans)) as drivers:
+        results = list(drivers.map(lambda item: run_render_plan(item[1], executor, item[0], args.verbose), plans))
+    SEGMENT_CACHE.evict()
+    return 0 if all(results) else 1
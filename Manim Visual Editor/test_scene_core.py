@@ -0,0 +1,165 @@
+"""scene_core 的无界面逻辑测试：项目文件读写、增量记录回放、分片切分与画质解析"""
+import json
+import zlib
+import argparse
+
+import pytest
+
+from scene_core import (
+    MobjectData, AnimationData, ProjectReader, write_project_file, diff_scene_states, apply_scene_diff,
+    replay_journal, SectionRenderPlan, parse_quality, PROJECT_MAGIC, PROJECT_HEADER, PROJECT_FORMAT_VERSION
+)
+
+def make_state(count: int = 3):
+    mobs = tuple(MobjectData(f"m{i}", f"obj{i}", "Text", "#FFFFFF", f"text {i}", "Arial", float(i), -float(i), 1.0 + i, i % 2 == 0).snapshot()
+                 for i in range(count))
+    anims = tuple(AnimationData(f"a{i}", "FadeIn", f"m{i}", f"obj{i}", duration=0.5 * (i + 1)).snapshot() for i in range(count))
+    return mobs, anims
+
+def read_state(path):
+    reader = ProjectReader(path)
+    return reader, (tuple(reader.iter_snapshots("mobjects", MobjectData)), tuple(reader.iter_snapshots("animations", AnimationData)))
+
+# === 项目文件读写 ===
+@pytest.mark.parametrize("binary", [True, False])
+def test_project_round_trip(tmp_path, binary):
+    path = str(tmp_path / "scene.manim")
+    state = make_state()
+    write_project_file(path, state[0], state[1], binary=binary)
+    reader, loaded = read_state(path)
+    assert reader.is_binary == binary
+    assert loaded == state
+
+def test_binary_round_trip_spans_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("scene_core.PROJECT_CHUNK_SIZE", 2)
+    path = str(tmp_path / "scene.manim")
+    state = make_state(5)
+    write_project_file(path, state[0], state[1])
+    reader, loaded = read_state(path)
+    assert len(reader.toc["sections"]["mobjects"]) == 3
+    assert loaded == state
+
+def test_empty_project_round_trip(tmp_path):
+    path = str(tmp_path / "empty.manim")
+    write_project_file(path, (), ())
+    assert read_state(path)[1] == ((), ())
+
+def write_binary_with_fields(path, mob_fields, mob_rows):
+    # 模拟其他版本写出的文件：目录表中的字段列表与当前数据类不同
+    blob = zlib.compress(json.dumps(mob_rows).encode("utf-8"))
+    toc = {"fields": {"mobjects": mob_fields, "animations": []}, "sections": {"mobjects": [], "animations": []}}
+    toc_bytes = json.dumps(toc).encode("utf-8")
+    while True:
+        toc["sections"]["mobjects"] = [{"offset": PROJECT_HEADER.size + len(toc_bytes), "length": len(blob), "count": len(mob_rows)}]
+        new_toc_bytes = json.dumps(toc).encode("utf-8")
+        if len(new_toc_bytes) == len(toc_bytes): break
+        toc_bytes = new_toc_bytes
+    with open(path, "wb") as f:
+        f.write(PROJECT_HEADER.pack(PROJECT_MAGIC, PROJECT_FORMAT_VERSION, len(toc_bytes)))
+        f.write(new_toc_bytes)
+        f.write(blob)
+
+def test_binary_stored_fields_mismatch(tmp_path):
+    # 字段顺序不同、缺少带默认值的字段、多出未知字段时按字段名映射
+    path = str(tmp_path / "other.manim")
+    write_binary_with_fields(path, ["name", "id", "mob_type", "color", "x", "extra"], [["A", "m1", "Circle", "#FF0000", 2.5, "ignored"]])
+    _, (mobs, anims) = read_state(path)
+    assert mobs == (MobjectData("m1", "A", "Circle", "#FF0000", x=2.5).snapshot(),)
+    assert anims == ()
+
+def test_legacy_json_missing_fields(tmp_path):
+    path = tmp_path / "legacy.manim"
+    path.write_text(json.dumps({
+        "mobjects": [{"id": "m1", "name": "A", "mob_type": "Square", "color": "BLUE"}],
+        "animations": [{"id": "a1", "anim_type": "Create", "target_id": "m1", "target_name_snapshot": "A"}]
+    }), encoding="utf-8")
+    reader, (mobs, anims) = read_state(str(path))
+    assert not reader.is_binary
+    assert mobs == (MobjectData("m1", "A", "Square", "BLUE").snapshot(),)
+    assert anims == (AnimationData("a1", "Create", "m1", "A").snapshot(),)
+
+def test_newer_format_version_rejected(tmp_path):
+    path = tmp_path / "future.manim"
+    path.write_bytes(PROJECT_HEADER.pack(PROJECT_MAGIC, PROJECT_FORMAT_VERSION + 1, 2) + b"{}")
+    with pytest.raises(ValueError):
+        ProjectReader(str(path))
+
+# === 增量记录 ===
+def edit_state(state):
+    mobs, anims = state
+    moved = MobjectData.from_snapshot(mobs[0])
+    moved.x = 10.0
+    added = MobjectData("m9", "new", "Circle", "#00FF00").snapshot()
+    # 修改 m0，删除 m1，新增 m9 并调整顺序；删除第一个动画
+    return (mobs[2], moved.snapshot(), added), anims[1:]
+
+def test_diff_apply_round_trip():
+    old = make_state()
+    new = edit_state(old)
+    record = diff_scene_states(old, new)
+    assert record["mobjects"]["remove"] == ["m1"]
+    assert record["mobjects"]["order"] == ["m2", "m0", "m9"]
+    assert apply_scene_diff(old, record) == new
+
+def test_diff_unchanged_is_none():
+    state = make_state()
+    assert diff_scene_states(state, state) is None
+
+def test_replay_journal(tmp_path):
+    # 记录经 JSON 往返后行变成列表，回放结果仍与原状态相等
+    states = [make_state()]
+    states.append(edit_state(states[-1]))
+    states.append((states[-1][0], states[-1][1] + (AnimationData("a9", "Write", "m9", "new").snapshot(),)))
+    journal = tmp_path / "scene.journal"
+    with open(journal, "w", encoding="utf-8") as f:
+        for old, new in zip(states, states[1:]):
+            f.write(json.dumps(diff_scene_states(old, new)) + "\n")
+    assert replay_journal(states[0], str(journal)) == states[-1]
+
+def test_replay_journal_truncated_last_line(tmp_path):
+    states = [make_state()]
+    states.append(edit_state(states[-1]))
+    final = (states[-1][0][:1], states[-1][1])
+    lines = [json.dumps(diff_scene_states(states[0], states[1])), json.dumps(diff_scene_states(states[1], final))]
+    journal = tmp_path / "scene.journal"
+    journal.write_text(lines[0] + "\n" + lines[1][:len(lines[1]) // 2], encoding="utf-8")
+    assert replay_journal(states[0], str(journal)) == states[1]
+
+def test_replay_journal_missing(tmp_path):
+    state = make_state()
+    assert replay_journal(state, str(tmp_path / "none.journal")) == state
+
+# === 分片切分 ===
+def test_split_shards_balances_duration():
+    pending = [("a", 1.0), ("b", 1.0), ("c", 1.0), ("d", 1.0)]
+    assert SectionRenderPlan.split_shards(pending, 2) == [["a", "b"], ["c", "d"]]
+
+def test_split_shards_keeps_order_and_keys():
+    pending = [(f"k{i}", d) for i, d in enumerate([3.0, 0.5, 0.5, 1.0, 2.0, 0.5])]
+    shards = SectionRenderPlan.split_shards(pending, 3)
+    assert len(shards) == 3
+    assert [k for shard in shards for k in shard] == [k for k, _ in pending]
+    assert all(shards)
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+def test_split_shards_limits(count):
+    pending = [("a", 1.0), ("b", 2.0)]
+    shards = SectionRenderPlan.split_shards(pending, count)
+    assert len(shards) == min(max(count, 1), len(pending))
+    assert SectionRenderPlan.split_shards([], count) == []
+
+# === 画质解析 ===
+@pytest.mark.parametrize("value, expected", [
+    ("1080p", ("1080p", "1920,1080")),
+    ("4k", ("4K", "3840,2160")),
+    ("720p (1280*720)", ("720p", "1280,720")),
+    ("1280,720", ("1280x720", "1280,720")),
+    ("640x360", ("640x360", "640,360")),
+])
+def test_parse_quality(value, expected):
+    assert parse_quality(value) == expected
+
+@pytest.mark.parametrize("value", ["8k", "1080", "wide,tall"])
+def test_parse_quality_rejects_unknown(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_quality(value)